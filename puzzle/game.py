@@ -0,0 +1,155 @@
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+
+@dataclass
+class GameInfo:
+    mine_count: int
+    width: int
+    height: int
+    is_game_over: bool
+    mine_info: List[str]
+    try_count: int
+    succeed_count: int
+    revision: int = 0
+    geometry: str = 'square'
+
+    """
+    mine_info
+    - : 확인하지 않음
+    0 ~ 8 : 주변 지뢰 갯수
+    > : 지뢰 표시
+    ! : 안전한 곳이라 표현했지만 틀린 장소
+    * : 게임 오버 이후 지뢰 위치들
+
+    revision : cell이 바뀔 때마다 증가하는 번호
+    geometry : 이웃 cell을 정하는 방법 (square, torus, hex)
+    """
+
+
+@dataclass
+class GameChangeInfo:
+    revision: int
+    is_game_over: bool
+    is_full: bool
+    cell_list: List[Tuple[int, int, str]] = field(default_factory=list)
+
+    """
+    cell_list : 요청한 revision 이후에 바뀐 (x, y, 현재 값) 목록
+    is_full : True면 cell_list가 board 전체이므로 이전 상태를 버려야 한다.
+    """
+
+
+class ChangeLog:
+    """
+    cell 변경 기록. 바뀐 cell 하나마다 revision이 1씩 증가한다.
+    """
+
+    def __init__(self):
+        self.revision = 0
+        self.reset_revision = 0
+        self.pos_list: List[Tuple[int, int]] = []
+
+    def add(self, x, y):
+        self.revision += 1
+        self.pos_list.append((x, y))
+
+    def extend(self, pos_list):
+        self.revision += len(pos_list)
+        self.pos_list.extend(pos_list)
+
+    def reset(self):
+        self.revision += 1
+        self.reset_revision = self.revision
+        self.pos_list = []
+
+    def since(self, revision) -> Optional[List[Tuple[int, int]]]:
+        """
+        :return: revision 이후에 바뀐 위치 목록. reset 이전이면 None
+        """
+        if revision < self.reset_revision:
+            return None
+
+        return list(dict.fromkeys(
+            self.pos_list[revision - self.reset_revision:]
+        ))
+
+    def get_changes(self, revision, mine_info, is_game_over):
+        pos_list = self.since(revision)
+        if pos_list is None:
+            return full_change_info(self.revision, mine_info, is_game_over)
+
+        return GameChangeInfo(
+            revision=self.revision,
+            is_game_over=is_game_over,
+            is_full=False,
+            cell_list=[(x, y, mine_info[y][x]) for x, y in pos_list]
+        )
+
+
+def full_change_info(revision, mine_info, is_game_over):
+    return GameChangeInfo(
+        revision=revision,
+        is_game_over=is_game_over,
+        is_full=True,
+        cell_list=[
+            (x, y, v)
+            for y, row in enumerate(mine_info)
+            for x, v in enumerate(row)
+        ]
+    )
+
+
+class GameInterfaceBase:
+    # 지뢰에 깃발을 모두 꽂아야 게임이 끝나는지
+    flag_to_win = True
+
+    def get_info(self) -> GameInfo:
+        raise NotImplementedError
+
+    def get_changes(self, revision) -> GameChangeInfo:
+        """
+        :param revision: 마지막으로 받은 revision
+        :return: 그 이후에 바뀐 cell들. 지원하지 않으면 board 전체를 돌려준다.
+        """
+        info = self.get_info()
+        return full_change_info(
+            info.revision, info.mine_info, info.is_game_over
+        )
+
+    def set_safe_place(self, x, y):
+        """
+        :param x: 안전한 곳이라고 표시할 x위치
+        :param y: 안전한 곳이라고 표시할 y위치
+        :return: bool - 제대로 선택했는지에 대해서 확인
+        """
+        raise NotImplementedError
+
+    def set_mine_place(self, x, y):
+        raise NotImplementedError
+
+    def set_place_batch(self, safe_list, mine_list):
+        """
+        여러 칸을 한번에 표시한다.
+        지원하지 않으면 한 칸씩 set_safe_place, set_mine_place를 부른다.
+        :param safe_list: 안전한 곳이라고 표시할 (x, y) 목록
+        :param mine_list: 지뢰라고 표시할 (x, y) 목록
+        """
+        for x, y in safe_list:
+            self.set_safe_place(x, y)
+        for x, y in mine_list:
+            self.set_mine_place(x, y)
+
+    def set_chord_place(self, x, y, open_list):
+        """
+        숫자 cell을 chord 클릭해서 깃발이 없는 주변 칸을 한번에 연다.
+        지원하지 않으면 open_list를 set_place_batch로 연다.
+        :param open_list: 이 chord로 열릴 것으로 보는 (x, y) 목록
+        """
+        self.set_place_batch(open_list, [])
+
+    def reset(self):
+        raise NotImplementedError
+
+    def wait(self):
+        raise NotImplementedError
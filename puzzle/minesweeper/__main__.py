@@ -1,12 +1,67 @@
-from puzzle.minesweeper.game_pygame import PygameInterface
+import argparse
+
+from puzzle.minesweeper.runner import create_interface
 from puzzle.minesweeper.solver import MinesweeperSolver
 
 
 def main():
-    w, h = 59, 31
+    parser = argparse.ArgumentParser(prog='puzzle.minesweeper')
+    parser.add_argument('--width', type=int, default=59)
+    parser.add_argument('--height', type=int, default=31)
+    parser.add_argument('--mines', type=int)
+    parser.add_argument('--count', type=int, default=20)
+    parser.add_argument('--seed', type=int)
+    parser.add_argument(
+        '--engine', choices=['memory', 'numpy'], default='memory',
+        help='화면 없이 진행할 때 쓰는 게임 엔진'
+    )
+    parser.add_argument(
+        '--geometry', choices=['square', 'torus', 'hex'], default='square',
+        help='화면 없이 진행할 때 쓰는 이웃 cell 모양'
+    )
+    parser.add_argument(
+        '--first-click', choices=['safe', 'zero'], default='safe',
+        help='safe - 첫 클릭한 곳만 안전, zero - 이웃까지 비워서 연쇄적으로 열림'
+    )
+    parser.add_argument(
+        '--deduction', choices=['subset', 'linear', 'sat'], default='subset',
+        help='확실한 곳을 찾는 방법'
+    )
+    parser.add_argument(
+        '--plan', choices=['auto', 'always'],
+        help='클릭 수를 줄이는 순서로 둔다. always면 깃발을 모두 꽂는다.'
+    )
+    parser.add_argument(
+        '--ui', action='store_true',
+        help='pygame 화면에 게임을 그리면서 진행한다.'
+    )
+    parser.add_argument(
+        '--fps', type=int,
+        help='--ui 일 때 따로 thread에서 초당 이만큼만 그린다.'
+    )
+    args = parser.parse_args()
+
+    w, h = args.width, args.height
+    mine_count = args.mines if args.mines is not None else w * h // 6
+
+    if args.ui:
+        from puzzle.minesweeper.game_pygame import PygameInterface
+        api = PygameInterface(w, h, mine_count, args.seed, fps=args.fps)
+    else:
+        api = create_interface(
+            args.engine, w, h, mine_count, args.seed, args.geometry,
+            args.first_click
+        )
+
     MinesweeperSolver(
-        PygameInterface(w, h, w * h // 6)
-    ).solve(20)
+        api, seed=args.seed, deduction=args.deduction, plan=args.plan
+    ).solve(args.count)
+
+    info = api.get_info()
+    print('Result :', info.succeed_count, '/', info.try_count)
+
+    if args.ui:
+        api.close()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,497 @@
+import argparse
+import random
+import time
+
+import numpy as np
+from PIL import Image
+
+from puzzle.game import GameInfo
+from puzzle.minesweeper.board import BoardCorpus, generate_corpus
+from puzzle.minesweeper.capture import (CELL_SIZE, FrameSource, WindowFrame,
+                                        board_box, game_over_box)
+from puzzle.minesweeper.game_memory import MemoryInterface
+from puzzle.minesweeper.geometry import get_geometry
+from puzzle.minesweeper.linear import LinearReducer
+from puzzle.minesweeper.recording import (RecordingInterface,
+                                          ReplayInterface, iter_record,
+                                          save_record_list)
+from puzzle.minesweeper.recognition import (BoardRecognizer,
+                                            load_block_info)
+from puzzle.minesweeper.reduction import RelationReducer
+from puzzle.minesweeper.sat import SatDeducer
+from puzzle.minesweeper.solver import MinesweeperSolver
+
+
+def random_board_info(width, height, mine_count, rng, reveal_ratio=0.4):
+    """
+    지뢰를 무작위로 깔고 안전한 곳을 무작위로 열어서 게임 중간 상태를 만든다.
+    """
+    position_list = [(x, y) for x in range(width) for y in range(height)]
+    mine_position = set(rng.sample(position_list, mine_count))
+    mine_info = [['-'] * width for _ in range(height)]
+
+    adj_list = get_geometry(width, height).adj_pos
+
+    safe_list = [pos for pos in position_list if pos not in mine_position]
+    rng.shuffle(safe_list)
+    opened = 0
+    goal = int(len(safe_list) * reveal_ratio)
+
+    for pos in safe_list:
+        if opened >= goal:
+            break
+
+        queue = [pos]
+        while queue:
+            x, y = queue.pop()
+            if mine_info[y][x] != '-':
+                continue
+
+            count = sum(1 for adj in adj_list(x, y) if adj in mine_position)
+            mine_info[y][x] = str(count)
+            opened += 1
+            if count == 0:
+                queue.extend(adj_list(x, y))
+
+    return GameInfo(
+        mine_count=mine_count,
+        width=width,
+        height=height,
+        is_game_over=False,
+        mine_info=[''.join(row) for row in mine_info],
+        try_count=0,
+        succeed_count=0
+    )
+
+
+def legacy_reduce(relation_list, rng):
+    """
+    RelationReducer 이전에 _solve_one 안에 있던 loop
+    """
+    relation_list = list(relation_list)
+    normalized = []
+
+    while relation_list:
+        relation = relation_list.pop()
+        if relation.is_empty():
+            continue
+
+        queue_size = len(relation_list)
+
+        for norm in normalized:
+            if norm.is_subset(relation):
+                relation_list.append(norm.sub_info(relation))
+            elif relation.is_subset(norm):
+                relation_list.append(relation.sub_info(norm))
+                relation_list.append(relation)
+                normalized.remove(norm)
+            else:
+                continue
+            break
+
+        if queue_size < len(relation_list):
+            rng.shuffle(relation_list)
+        else:
+            normalized.append(relation)
+
+    return normalized
+
+
+def build_relation_list(info):
+    solver = MinesweeperSolver(None)
+    index = solver._get_cell_index(info)
+    return [
+        solver._adj_list(x, y, info, v, index)
+        for x, y, v in solver._number_block_list(info.mine_info)
+    ]
+
+
+def count_deduction(relation_list):
+    safe = mine = 0
+    for relation in relation_list:
+        if relation.has_save():
+            safe |= relation.mask
+        elif relation.has_bomb():
+            mine |= relation.mask
+    return safe.bit_count(), mine.bit_count()
+
+
+def bench_reduction(args):
+    rng = random.Random(args.seed)
+    state_list = [
+        build_relation_list(random_board_info(
+            args.width, args.height, args.mines, rng, args.reveal
+        ))
+        for _ in range(args.count)
+    ]
+
+    for name, reduce in [
+        ('legacy', lambda r: legacy_reduce(r, random.Random(args.seed))),
+        ('worklist', lambda r: RelationReducer().reduce(r))
+    ]:
+        total_safe = total_mine = 0
+        start = time.perf_counter()
+        for relation_list in state_list:
+            safe, mine = count_deduction(reduce(relation_list))
+            total_safe += safe
+            total_mine += mine
+        elapsed = time.perf_counter() - start
+
+        print(
+            f'{name:>10} : {elapsed * 1000 / len(state_list):8.3f} ms/state'
+            f'  safe={total_safe} mine={total_mine}'
+        )
+
+
+def subset_deduce(relation_list):
+    safe = mine = 0
+    for relation in RelationReducer().reduce(relation_list):
+        if relation.has_save():
+            safe |= relation.mask
+        elif relation.has_bomb():
+            mine |= relation.mask
+    return safe, mine
+
+
+def recorded_info_list(path):
+    """
+    기록한 게임을 처음부터 다시 두면서 수를 두기 직전의 board를 모은다.
+    """
+    info_list = []
+    for record in iter_record(path):
+        api = ReplayInterface(record)
+        for _ in record.move_list:
+            if api.is_game_over:
+                break
+            info_list.append(api.get_info())
+            # ReplayInterface는 받은 수 대신 기록한 수를 둔다.
+            api.set_place_batch([], [])
+    return info_list
+
+
+def bench_deduction(args):
+    if args.record:
+        info_list = recorded_info_list(args.record)
+    else:
+        rng = random.Random(args.seed)
+        info_list = [
+            random_board_info(
+                args.width, args.height, args.mines, rng, args.reveal
+            )
+            for _ in range(args.count)
+        ]
+    state_list = [
+        relation_list
+        for relation_list in map(build_relation_list, info_list)
+        if relation_list
+    ]
+    print(f'States : {len(state_list)}')
+
+    for name, deduce in [
+        ('subset', subset_deduce),
+        ('linear', lambda r: LinearReducer().deduce(r)),
+        # solver의 linear 모드: 부분집합으로 줄인 관계를 다시 소거한다.
+        ('subset+lin', lambda r: LinearReducer().deduce(
+            RelationReducer().reduce(r)
+        )),
+        ('sat', lambda r: SatDeducer(args.sat).deduce(r))
+    ]:
+        total = 0
+        start = time.perf_counter()
+        for relation_list in state_list:
+            safe, mine = deduce(relation_list)
+            total += (safe | mine).bit_count()
+        elapsed = (time.perf_counter() - start) * 1000
+
+        print(
+            f'{name:>10} : {elapsed / len(state_list):8.3f} ms/state'
+            f'  found={total} ({total / elapsed:.2f} cells/ms)'
+        )
+
+
+def percentile(sorted_list, q):
+    return sorted_list[min(len(sorted_list) - 1, len(sorted_list) * q // 100)]
+
+
+def bench_boards(args):
+    start = time.perf_counter()
+    generate_corpus(
+        args.path, args.width, args.height, args.mines, args.count,
+        args.seed, args.first_click
+    )
+    print(
+        f'{args.count} boards -> {args.path}'
+        f' ({time.perf_counter() - start:.2f} s)'
+    )
+
+
+def bench_record(args):
+    corpus = BoardCorpus(args.corpus) if args.corpus else None
+    api = RecordingInterface(
+        args.width, args.height, args.mines, args.seed, args.geometry,
+        args.first_click, corpus
+    )
+    solver = MinesweeperSolver(
+        api, seed=args.seed, deduction=args.deduction
+    )
+    for _ in range(args.count):
+        solver.solve_game()
+
+    save_record_list(args.path, api.record_list)
+    print(
+        f'{len(api.record_list)} games'
+        f' ({api.succeed_count} / {api.try_count}) -> {args.path}'
+    )
+
+
+def bench_replay(args):
+    solver = MinesweeperSolver(
+        None, seed=args.seed, deduction=args.deduction
+    )
+    latency_list = []
+    game_count = 0
+    start = time.perf_counter()
+
+    for record in iter_record(args.path):
+        solver.api = ReplayInterface(record)
+        solver.solve_game()
+        latency_list.extend(solver.api.latency_list)
+        game_count += 1
+
+    elapsed = time.perf_counter() - start
+    if not latency_list:
+        print('No moves')
+        return
+
+    latency_list.sort()
+    print(f'Games : {game_count}, moves : {len(latency_list)}')
+    print(
+        'Move latency :' + ','.join(
+            f' p{q} {percentile(latency_list, q) * 1000:.3f} ms'
+            for q in (50, 90, 99)
+        ) + f', max {latency_list[-1] * 1000:.3f} ms'
+    )
+    print(
+        f'Deduced cells : {solver.deduced_count},'
+        f' guesses : {solver.guess_count}'
+    )
+    print(f'Elapsed : {elapsed:.2f} s')
+
+
+def bench_plan(args):
+    """
+    같은 board들을 MovePlanner 없이, 있이 풀어서 게임마다 클릭 수를 비교한다.
+    """
+    for plan in [None, 'always', 'auto']:
+        api = MemoryInterface(
+            args.width, args.height, args.mines, args.seed, args.geometry,
+            policy=args.first_click, flag_to_win=not args.no_flag
+        )
+        solver = MinesweeperSolver(
+            api, seed=args.seed, deduction=args.deduction, plan=plan
+        )
+        start = time.perf_counter()
+        for _ in range(args.count):
+            solver.solve_game()
+        elapsed = time.perf_counter() - start
+
+        print(
+            f'{plan or "none":>6} : {solver.action_count / args.count:8.1f}'
+            f' actions/game  {api.succeed_count} / {api.try_count}'
+            f'  {elapsed * 1000 / args.count:.1f} ms/game'
+        )
+
+
+def synthetic_frame_list(args, rng):
+    """
+    찍어 둔 창 화면이 없을 때 쓰는 가짜 창 화면과 template.
+    기호마다 색과 무늬가 다른 cell을 random_board_info 대로 붙인다.
+    """
+    symbol_list = '012345678-'
+    np_rng = np.random.default_rng(args.seed)
+    block_info = []
+    for i, symbol in enumerate(symbol_list):
+        block = np.full((CELL_SIZE, CELL_SIZE, 3), 40 + i * 20, np.uint8)
+        block[5:20, 4 + i:8 + i] = np_rng.integers(0, 255, 3)
+        block_info.append((block, symbol))
+    block_map = dict((symbol, block) for block, symbol in block_info)
+
+    window_width = args.width * CELL_SIZE + 200
+    window_height = 280 + args.height * CELL_SIZE
+    left, top, _, _ = board_box(window_width, args.width, args.height)
+
+    frame_list = []
+    for _ in range(args.count):
+        info = random_board_info(
+            args.width, args.height, args.mines, rng, rng.random()
+        )
+        frame = np.full((window_height, window_width, 3), 192, np.uint8)
+        over_left, over_top, over_right, over_bottom = \
+            game_over_box(window_width)
+        frame[over_top:over_bottom, over_left:over_right] = (0, 255, 0)
+        for y, row in enumerate(info.mine_info):
+            for x, cell in enumerate(row):
+                frame[
+                    top + y * CELL_SIZE:top + (y + 1) * CELL_SIZE,
+                    left + x * CELL_SIZE:left + (x + 1) * CELL_SIZE
+                ] = block_map[cell]
+        frame_list.append(frame)
+
+    return frame_list, [
+        (Image.fromarray(block), symbol) for block, symbol in block_info
+    ]
+
+
+def bench_capture(args):
+    rng = random.Random(args.seed)
+    if args.frames:
+        source = FrameSource.load(args.frames)
+        block_info = load_block_info(args.templates, '012345xxx!->')
+    else:
+        frame_list, block_info = synthetic_frame_list(args, rng)
+        source = FrameSource(frame_list)
+
+    frame_count = len(source.frame_list)
+    window_height, window_width = source.frame_list[0].shape[:2]
+    rect = 0, 0, window_width, window_height
+    box_list = [
+        board_box(window_width, args.width, args.height),
+        game_over_box(window_width)
+    ]
+
+    # 이전 방식 : 창 전체를 새 배열로 찍고 필요한 영역을 잘라낸다.
+    def full_window(recognizer):
+        screenshot = np.array(source.grab(rect))
+        (left, top, right, bottom), _ = box_list
+        recognizer.recognize(screenshot[top:bottom, left:right])
+
+    def board_only(recognizer):
+        frame = WindowFrame(source, rect)
+        recognizer.recognize(frame.grab(box_list[0]))
+        frame.grab(box_list[1])
+
+    for name, capture, pixel in [
+        ('full', full_window, window_width * window_height),
+        ('board', board_only, sum(
+            (right - left) * (bottom - top)
+            for left, top, right, bottom in box_list
+        ))
+    ]:
+        recognizer = BoardRecognizer(block_info)
+        source.index = 0
+        start = time.perf_counter()
+        for _ in range(frame_count):
+            capture(recognizer)
+            source.next_frame()
+        elapsed = (time.perf_counter() - start) * 1000
+
+        print(
+            f'{name:>6} : {elapsed / frame_count:8.3f} ms/frame'
+            f'  {pixel} px/frame  {recognizer.cache}'
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='puzzle.minesweeper.benchmark')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    reduction = subparsers.add_parser('reduction')
+    reduction.add_argument('--width', type=int, default=59)
+    reduction.add_argument('--height', type=int, default=31)
+    reduction.add_argument('--mines', type=int, default=59 * 31 // 6)
+    reduction.add_argument('--count', type=int, default=100)
+    reduction.add_argument('--reveal', type=float, default=0.4)
+    reduction.add_argument('--seed', type=int, default=0)
+    reduction.set_defaults(func=bench_reduction)
+
+    deduction = subparsers.add_parser('deduction')
+    deduction.add_argument('--width', type=int, default=59)
+    deduction.add_argument('--height', type=int, default=31)
+    deduction.add_argument('--mines', type=int, default=59 * 31 // 6)
+    deduction.add_argument('--count', type=int, default=100)
+    deduction.add_argument('--reveal', type=float, default=0.4)
+    deduction.add_argument('--seed', type=int, default=0)
+    deduction.add_argument(
+        '--sat', choices=['auto', 'builtin', 'pysat'], default='auto'
+    )
+    deduction.add_argument(
+        '--record', help='record 로 기록한 파일. 주면 그 게임들의 board를 쓴다.'
+    )
+    deduction.set_defaults(func=bench_deduction)
+
+    boards = subparsers.add_parser('boards')
+    boards.add_argument('path')
+    boards.add_argument('--width', type=int, default=30)
+    boards.add_argument('--height', type=int, default=16)
+    boards.add_argument('--mines', type=int, default=99)
+    boards.add_argument('--count', type=int, default=100000)
+    boards.add_argument('--seed', type=int, default=0)
+    boards.add_argument(
+        '--first-click', choices=['safe', 'zero'], default='safe'
+    )
+    boards.set_defaults(func=bench_boards)
+
+    record = subparsers.add_parser('record')
+    record.add_argument('path')
+    record.add_argument('--width', type=int, default=30)
+    record.add_argument('--height', type=int, default=16)
+    record.add_argument('--mines', type=int, default=99)
+    record.add_argument('--count', type=int, default=1000)
+    record.add_argument('--seed', type=int, default=0)
+    record.add_argument(
+        '--geometry', choices=['square', 'torus', 'hex'], default='square'
+    )
+    record.add_argument(
+        '--deduction', choices=['subset', 'linear', 'sat'], default='subset'
+    )
+    record.add_argument(
+        '--first-click', choices=['safe', 'zero'], default='safe'
+    )
+    record.add_argument('--corpus', help='boards 로 미리 만든 board 파일')
+    record.set_defaults(func=bench_record)
+
+    replay = subparsers.add_parser('replay')
+    replay.add_argument('path')
+    replay.add_argument('--seed', type=int, default=0)
+    replay.add_argument(
+        '--deduction', choices=['subset', 'linear', 'sat'], default='subset'
+    )
+    replay.set_defaults(func=bench_replay)
+
+    plan = subparsers.add_parser('plan')
+    plan.add_argument('--width', type=int, default=30)
+    plan.add_argument('--height', type=int, default=16)
+    plan.add_argument('--mines', type=int, default=99)
+    plan.add_argument('--count', type=int, default=200)
+    plan.add_argument('--seed', type=int, default=0)
+    plan.add_argument(
+        '--geometry', choices=['square', 'torus', 'hex'], default='square'
+    )
+    plan.add_argument(
+        '--first-click', choices=['safe', 'zero'], default='safe'
+    )
+    plan.add_argument(
+        '--deduction', choices=['subset', 'linear', 'sat'], default='subset'
+    )
+    plan.add_argument(
+        '--no-flag', action='store_true',
+        help='깃발 없이 안전한 곳을 모두 열면 이기는 규칙 (창 게임과 같음)'
+    )
+    plan.set_defaults(func=bench_plan)
+
+    capture = subparsers.add_parser('capture')
+    capture.add_argument('--frames', help='save_frame 으로 찍어 둔 directory')
+    capture.add_argument('--templates', default='mine_checker.png')
+    capture.add_argument('--width', type=int, default=30)
+    capture.add_argument('--height', type=int, default=16)
+    capture.add_argument('--mines', type=int, default=99)
+    capture.add_argument('--count', type=int, default=200)
+    capture.add_argument('--seed', type=int, default=0)
+    capture.set_defaults(func=bench_capture)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+import mmap
+import random
+import struct
+from typing import List, Optional, Tuple
+
+from puzzle.minesweeper.constraint import iter_bit
+from puzzle.minesweeper.geometry import HEX, SQUARE, get_geometry
+
+FIRST_SAFE = 'safe'
+FIRST_ZERO = 'zero'
+POLICY_LIST = [FIRST_SAFE, FIRST_ZERO]
+
+CORPUS_MAGIC = b'MSBD'
+# magic, width, height, mine_count, board 수, policy, 첫 클릭 x, y
+CORPUS_HEADER = struct.Struct('<4sHHIIBHH')
+
+
+class BoardGenerator:
+    """
+    seed 하나로 한 판의 지뢰 위치를 정한다.
+    전체 좌표 list를 만들어 섞지 않고 cell 번호에서 random.sample로 고른다.
+
+    policy
+    - safe : 첫번째 클릭한 곳에는 지뢰가 없다.
+    - zero : 첫번째 클릭한 곳의 이웃에도 지뢰가 없어서 연쇄적으로 열린다.
+      지뢰가 많아서 이웃까지 비울 수 없으면 safe로 만든다.
+    """
+
+    def __init__(self, width, height, mine_count, geometry=SQUARE,
+                 policy=FIRST_SAFE):
+        if policy not in POLICY_LIST:
+            raise ValueError(f'Unknown policy : {policy}')
+        if mine_count >= width * height:
+            raise ValueError(f'Too many mines : {mine_count}')
+
+        self.geometry = get_geometry(width, height, geometry)
+        self.mine_count = mine_count
+        self.policy = policy
+
+    def generate(self, seed, first_click: Optional[Tuple[int, int]] = None
+                 ) -> List[int]:
+        """
+        :return: 지뢰가 있는 cell id 목록 (오름차순)
+        """
+        size = self.geometry.width * self.geometry.height
+        excluded = sorted(self._excluded(first_click))
+
+        index_list = random.Random(seed).sample(
+            range(size - len(excluded)), self.mine_count
+        )
+        index_list.sort()
+
+        # 제외한 cell을 건너뛰도록 번호를 민다.
+        result = []
+        for index in index_list:
+            for cell_id in excluded:
+                if index >= cell_id:
+                    index += 1
+            result.append(index)
+        return result
+
+    def _excluded(self, first_click):
+        if first_click is None:
+            return []
+
+        first = self.geometry.to_id(*first_click)
+        if self.policy == FIRST_ZERO:
+            excluded = [first, *self.geometry.adj_id(first)]
+            size = self.geometry.width * self.geometry.height
+            if self.mine_count <= size - len(excluded):
+                return excluded
+        return [first]
+
+
+def generate_corpus(path, width, height, mine_count, count, seed=0,
+                    policy=FIRST_SAFE):
+    """
+    board를 count개 만들어서 한 파일에 bitmap으로 이어 적는다.
+    첫 클릭은 가운데로 두고 만든다.
+    """
+    generator = BoardGenerator(width, height, mine_count, policy=policy)
+    click = width // 2, height // 2
+    board_size = (width * height + 7) // 8
+    rng = random.Random(seed)
+
+    with open(path, 'wb') as f:
+        f.write(CORPUS_HEADER.pack(
+            CORPUS_MAGIC, width, height, mine_count, count,
+            POLICY_LIST.index(policy), *click
+        ))
+        for _ in range(count):
+            mask = 0
+            for cell_id in generator.generate(rng.getrandbits(63), click):
+                mask |= 1 << cell_id
+            f.write(mask.to_bytes(board_size, 'little'))
+
+
+class BoardCorpus:
+    """
+    generate_corpus로 만든 파일을 mmap으로 열어서 필요한 판만 읽는다.
+
+    board는 가운데를 첫 클릭으로 만든 것이므로, 다른 곳을 처음 클릭하면
+    가장자리가 이어진 것처럼 board 전체를 밀어서 그 곳으로 옮긴다.
+    (hex는 줄을 밀면 이웃 모양이 바뀌므로 쓸 수 없다.)
+    """
+
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, self.width, self.height, self.mine_count, self.count,
+         policy, click_x, click_y) = CORPUS_HEADER.unpack_from(self.data)
+        if magic != CORPUS_MAGIC:
+            raise ValueError(f'Not a board corpus : {path}')
+
+        self.policy = POLICY_LIST[policy]
+        self.click = click_x, click_y
+        self.board_size = (self.width * self.height + 7) // 8
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+    def get_mine_list(self, index, first_click=None) -> List[int]:
+        begin = CORPUS_HEADER.size + index * self.board_size
+        mask = int.from_bytes(
+            self.data[begin:begin + self.board_size], 'little'
+        )
+        if first_click is None or tuple(first_click) == self.click:
+            return list(iter_bit(mask))
+
+        width, height = self.width, self.height
+        dx = first_click[0] - self.click[0]
+        dy = first_click[1] - self.click[1]
+        return sorted(
+            (y + dy) % height * width + (x + dx) % width
+            for y, x in (divmod(cell_id, width) for cell_id in iter_bit(mask))
+        )
+
+
+def check_corpus(corpus: BoardCorpus, width, height, mine_count, geometry,
+                 policy=FIRST_SAFE):
+    if (corpus.width, corpus.height, corpus.mine_count) != \
+            (width, height, mine_count):
+        raise ValueError('Corpus does not match the board size')
+    if corpus.policy != policy:
+        raise ValueError(
+            f'Corpus was made with policy {corpus.policy}, not {policy}'
+        )
+    if geometry == HEX:
+        raise ValueError('Corpus can not be used with hex geometry')
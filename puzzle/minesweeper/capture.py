@@ -0,0 +1,228 @@
+import statistics
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+from PIL import Image
+
+# 창 안에서 board와 게임오버 표시의 위치
+CELL_SIZE = 25
+BOARD_TOP = 240
+GAME_OVER_TOP = 200
+GAME_OVER_SIZE = 15
+
+
+def board_box(window_width, width, height):
+    """
+    창 왼쪽 위 기준의 board 영역 (left, top, right, bottom)
+    """
+    left = window_width // 2 - width * CELL_SIZE // 2
+    return (
+        left, BOARD_TOP,
+        left + width * CELL_SIZE, BOARD_TOP + height * CELL_SIZE
+    )
+
+
+def game_over_box(window_width):
+    middle = window_width // 2
+    return (
+        middle - GAME_OVER_SIZE, GAME_OVER_TOP - GAME_OVER_SIZE,
+        middle + GAME_OVER_SIZE, GAME_OVER_TOP + GAME_OVER_SIZE
+    )
+
+
+class ScreenCapture:
+    """
+    GDI BitBlt로 화면의 일부만 복사한다.
+
+    화면 DC와 memory DC는 한번만 만들고,
+    bitmap과 결과 배열은 영역 크기마다 한번만 만들어서 다시 쓴다.
+    grab이 돌려주는 배열은 같은 크기를 다시 grab하면 덮어써진다.
+    """
+
+    def __init__(self):
+        import win32gui
+        import win32ui
+
+        self.screen_dc = win32gui.GetDC(0)
+        self.source_dc = win32ui.CreateDCFromHandle(self.screen_dc)
+        self.memory_dc = self.source_dc.CreateCompatibleDC()
+        self.buffer_map: Dict[Tuple[int, int], tuple] = {}
+
+    def _get_buffer(self, width, height):
+        buffer = self.buffer_map.get((width, height))
+        if buffer is None:
+            import win32ui
+
+            bitmap = win32ui.CreateBitmap()
+            bitmap.CreateCompatibleBitmap(self.source_dc, width, height)
+            buffer = bitmap, np.empty((height, width, 3), np.uint8)
+            self.buffer_map[width, height] = buffer
+        return buffer
+
+    def grab(self, box) -> np.ndarray:
+        """
+        :param box: 화면 기준 (left, top, right, bottom)
+        :return: (height, width, 3) RGB
+        """
+        import win32con
+
+        left, top, right, bottom = box
+        width, height = right - left, bottom - top
+        bitmap, array = self._get_buffer(width, height)
+
+        self.memory_dc.SelectObject(bitmap)
+        self.memory_dc.BitBlt(
+            (0, 0), (width, height),
+            self.source_dc, (left, top), win32con.SRCCOPY
+        )
+        bgra = np.frombuffer(bitmap.GetBitmapBits(True), np.uint8)
+        np.copyto(array, bgra.reshape(height, width, 4)[:, :, 2::-1])
+        return array
+
+    def close(self):
+        import win32gui
+
+        for bitmap, _ in self.buffer_map.values():
+            win32gui.DeleteObject(bitmap.GetHandle())
+        self.buffer_map.clear()
+        self.memory_dc.DeleteDC()
+        self.source_dc.DeleteDC()
+        win32gui.ReleaseDC(0, self.screen_dc)
+
+
+class FrameSource:
+    """
+    미리 찍어 둔 창 화면을 차례로 돌려준다.
+    win32가 없는 곳에서 인식 과정을 benchmark 할 때 쓴다.
+    """
+
+    def __init__(self, frame_list: List[np.ndarray]):
+        self.frame_list = frame_list
+        self.index = 0
+        self.grab_count = 0
+
+    @classmethod
+    def load(cls, path):
+        """
+        :param path: 창 화면 png들이 있는 directory. 이름 순서로 읽는다.
+        """
+        return cls([
+            np.asarray(Image.open(image_path).convert('RGB'))
+            for image_path in sorted(Path(path).glob('*.png'))
+        ])
+
+    def next_frame(self):
+        self.index = (self.index + 1) % len(self.frame_list)
+
+    def grab(self, box) -> np.ndarray:
+        left, top, right, bottom = box
+        self.grab_count += 1
+        return self.frame_list[self.index][top:bottom, left:right]
+
+    def close(self):
+        pass
+
+
+class WindowFrame:
+    """
+    창 하나의 한 순간의 화면.
+
+    crop이나 grab을 부를 때 그 영역만 capture 하므로,
+    클릭만 하는 callback에서는 capture를 하지 않는다.
+    """
+
+    def __init__(self, source, rect):
+        self.source = source
+        self.rect = rect
+
+    def grab(self, box) -> np.ndarray:
+        left, top, right, bottom = box
+        return self.source.grab((
+            self.rect[0] + left, self.rect[1] + top,
+            self.rect[0] + right, self.rect[1] + bottom
+        ))
+
+    def crop(self, box) -> Image.Image:
+        return Image.fromarray(self.grab(box))
+
+
+def checksum(array: np.ndarray) -> int:
+    return zlib.crc32(np.ascontiguousarray(array))
+
+
+class SettleDetector:
+    """
+    클릭한 뒤 화면이 바뀌고 더 바뀌지 않을 때까지 기다린다.
+
+    interval 마다 영역을 찍어서 checksum을 비교하고,
+    클릭 전과 달라진 뒤 max(stable_count * interval, min_settle) 동안
+    그대로면 끝난 것으로 본다. interval이 아주 짧아져도 두 frame에 걸쳐
+    그려지는 중간 화면을 끝난 것으로 보지 않도록 min_settle을 둔다.
+    바뀌지 않으면 timeout 까지 기다린다.
+    latency_list : 클릭부터 마지막으로 바뀐 것을 본 때까지 (초).
+        바뀐 것을 못 보고 timeout 된 경우는 넣지 않는다.
+    interval은 최근 latency의 중간값에 맞춰 스스로 조절한다.
+    """
+
+    def __init__(self, timeout=0.5, interval=0.01, stable_count=2,
+                 min_interval=0.002, max_interval=0.05, history=32,
+                 min_settle=0.02):
+        self.timeout = timeout
+        self.interval = interval
+        self.stable_count = stable_count
+        self.min_settle = min_settle
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.history = history
+
+        self.latency_list: List[float] = []
+        self.timeout_count = 0
+
+    def wait(self, grab, before=None) -> float:
+        """
+        :param grab: 영역을 찍어서 배열을 돌려주는 함수
+        :param before: 클릭 전 checksum. 없으면 멈추기만 기다린다.
+        :return: latency (초)
+        """
+        start = time.perf_counter()
+        if before is None:
+            last = checksum(grab())
+            changed = True
+        else:
+            last = before
+            changed = False
+        changed_at = start
+        quiet = max(self.stable_count * self.interval, self.min_settle)
+
+        while True:
+            time.sleep(self.interval)
+            current = checksum(grab())
+            now = time.perf_counter()
+
+            if current != last:
+                last = current
+                changed = True
+                changed_at = now
+            elif changed and now - changed_at >= quiet:
+                break
+
+            if now - start >= self.timeout:
+                self.timeout_count += 1
+                break
+
+        latency = changed_at - start
+        if changed_at > start:
+            self._record(latency)
+        return latency
+
+    def _record(self, latency):
+        self.latency_list.append(latency)
+
+        # 보통 걸리는 시간 안에 몇 번 확인할 수 있을 만큼 poll 한다.
+        median = statistics.median(self.latency_list[-self.history:])
+        self.interval = min(
+            max(median / 4, self.min_interval), self.max_interval
+        )
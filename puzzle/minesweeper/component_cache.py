@@ -0,0 +1,104 @@
+from collections import OrderedDict
+
+from puzzle.minesweeper.constraint import iter_bit
+
+# 좌우/상하 뒤집기와 회전 (8가지 대칭)
+SYMMETRY_LIST = [
+    lambda x, y: (x, y),
+    lambda x, y: (-x, y),
+    lambda x, y: (x, -y),
+    lambda x, y: (-x, -y),
+    lambda x, y: (y, x),
+    lambda x, y: (-y, x),
+    lambda x, y: (y, -x),
+    lambda x, y: (-y, -x),
+]
+
+
+def component_signature(relation_list, index=None):
+    """
+    component를 대칭과 위치에 상관없는 key로 바꾼다.
+
+    cell들을 대칭 변환한 좌표 순서로 0, 1, 2, ... 번호를 붙이고,
+    관계를 (번호 tuple, 지뢰 수) 로 적은 것 중 가장 작은 것을 key로 쓴다.
+    :return: (key, key의 번호 순서대로 나열한 cell id 목록)
+    """
+    mask = 0
+    for relation in relation_list:
+        mask |= relation.mask
+    cell_list = list(iter_bit(mask))
+
+    if index is None:
+        order_list = [cell_list]
+    else:
+        pos_list = [index.to_pos(cell_id) for cell_id in cell_list]
+        order_list = [
+            [
+                cell_id
+                for _, cell_id in sorted(
+                    zip((symmetry(x, y) for x, y in pos_list), cell_list)
+                )
+            ]
+            for symmetry in SYMMETRY_LIST
+        ]
+
+    best = None
+    for order in order_list:
+        position = {cell_id: i for i, cell_id in enumerate(order)}
+        key = (len(order), tuple(sorted(
+            (
+                tuple(sorted(
+                    position[cell_id] for cell_id in iter_bit(relation.mask)
+                )),
+                relation.count
+            )
+            for relation in relation_list
+        )))
+        if best is None or key < best[0]:
+            best = key, order
+
+    return best
+
+
+class ComponentCache:
+    """
+    풀어둔 component 결과를 signature로 저장하는 LRU cache.
+    hit_count, miss_count, eviction_count 로 크기를 조절한다.
+    """
+
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self.data = OrderedDict()
+        self.hit_count = 0
+        self.miss_count = 0
+        self.eviction_count = 0
+
+    def __len__(self):
+        return len(self.data)
+
+    def __repr__(self):
+        return (
+            f'ComponentCache(size={len(self.data)}/{self.maxsize},'
+            f' hit={self.hit_count}, miss={self.miss_count},'
+            f' eviction={self.eviction_count})'
+        )
+
+    def get(self, key):
+        value = self.data.get(key)
+        if value is None:
+            self.miss_count += 1
+            return None
+
+        self.data.move_to_end(key)
+        self.hit_count += 1
+        return value
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+
+        self.data[key] = value
+        self.data.move_to_end(key)
+        while len(self.data) > self.maxsize:
+            self.data.popitem(last=False)
+            self.eviction_count += 1
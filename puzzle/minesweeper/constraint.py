@@ -0,0 +1,79 @@
+def iter_bit(mask):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class CellIndex:
+    """
+    (x, y) 좌표와 bit 위치(cell id)를 서로 변환한다.
+    cell id = y * width + x
+    """
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+
+    def to_id(self, x, y):
+        return y * self.width + x
+
+    def to_pos(self, cell_id):
+        y, x = divmod(cell_id, self.width)
+        return x, y
+
+    def to_mask(self, pos_list):
+        mask = 0
+        for x, y in pos_list:
+            mask |= 1 << (y * self.width + x)
+        return mask
+
+    def iter_id(self, mask):
+        return iter_bit(mask)
+
+    def iter_pos(self, mask):
+        for cell_id in self.iter_id(mask):
+            yield self.to_pos(cell_id)
+
+
+class BitRelation:
+    """
+    숫자 cell 하나가 만드는 관계. 확인하지 않은 칸들을 int bitmask로 들고 있는다.
+    mask : 관계에 포함된 cell id들의 bit
+    count : 그 중 지뢰의 갯수
+    """
+
+    __slots__ = ('mask', 'count')
+
+    def __init__(self, mask, count):
+        self.mask: int = mask
+        self.count: int = count
+
+    def __eq__(self, other):
+        if not isinstance(other, BitRelation):
+            return NotImplemented
+        return self.mask == other.mask and self.count == other.count
+
+    def __hash__(self):
+        return hash((self.mask, self.count))
+
+    def __repr__(self):
+        return f'BitRelation({self.mask:#x}, {self.count})'
+
+    def size(self):
+        return self.mask.bit_count()
+
+    def is_subset(self, other):
+        return self.mask & other.mask == self.mask
+
+    def sub_info(self, other):
+        return BitRelation(other.mask & ~self.mask, other.count - self.count)
+
+    def is_empty(self):
+        return self.mask == 0
+
+    def has_save(self):
+        return self.mask != 0 and self.count == 0
+
+    def has_bomb(self):
+        return self.mask.bit_count() == self.count
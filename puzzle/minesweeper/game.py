@@ -1,104 +1,127 @@
 import datetime
 import functools
 import re
-import time
-from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
-from typing import List
 
 import win32api
 import win32con
 import win32gui
-from PIL import Image, ImageChops, ImageGrab
+from PIL import Image
 
+from puzzle.game import ChangeLog, GameInfo, GameInterfaceBase
+from puzzle.minesweeper.capture import (CELL_SIZE, ScreenCapture,
+                                        SettleDetector, WindowFrame,
+                                        board_box, checksum, game_over_box)
+from puzzle.minesweeper.recognition import (BoardRecognizer, image_distance,
+                                            load_block_info)
 
-@dataclass
-class GameInfo:
-    mine_count: int
-    width: int
-    height: int
-    is_game_over: bool
-    mine_info: List[str]
-    try_count: int
-    succeed_count: int
 
+class WindowSession:
     """
-    mine_info
-    - : 확인하지 않음
-    0 ~ 8 : 주변 지뢰 갯수
-    > : 지뢰 표시
-    ! : 안전한 곳이라 표현했지만 틀린 장소
-    * : 게임 오버 이후 지뢰 위치들
-    """
-
-
-def average_color(histogram):
-    total = 0
-    color = 0
-    for index, value in enumerate(histogram):
-        total += value
-        color += index * value
-
-    return color / (total * 255)
+    게임 창을 한번 찾으면 hwnd와 창 위치, board 위치를 기억해 둔다.
 
+    매번 IsWindow와 GetWindowRect로 창 하나만 확인해서
+    창이 움직였으면 위치만 다시 계산하고,
+    닫혔으면 그때만 EnumWindows로 다시 찾는다.
+    """
 
-def image_distance(img1, img2):
-    assert img1.size == img2.size
+    def __init__(self, width, height, is_game_title):
+        self.width = width
+        self.height = height
+        self.is_game_title = is_game_title
 
-    img_diff = ImageChops.difference(img1, img2)
-    histogram = img_diff.histogram()
-    avg_r = average_color(histogram[:256])
-    avg_g = average_color(histogram[256:512])
-    avg_b = average_color(histogram[512:])
-    return (avg_r + avg_g + avg_b) / 3
+        self.hwnd = None
+        self.rect = None
+        self.board_box = None
+        self.game_over_box = None
+        self.find_count = 0
 
+    def _check_window(self, hwnd, hwnd_list):
+        # 열려있는지 확인
+        if not win32gui.IsWindowVisible(hwnd):
+            return
 
-class GameInterfaceBase:
-    def get_info(self) -> GameInfo:
-        raise NotImplementedError
+        # Game 화면인지 확인
+        title: str = win32gui.GetWindowText(hwnd)
+        if self.is_game_title(title):
+            hwnd_list.append(hwnd)
+
+    def _find_window(self):
+        hwnd_list = []
+        win32gui.EnumWindows(self._check_window, hwnd_list)
+        self.find_count += 1
+        self.hwnd = hwnd_list[0] if hwnd_list else None
+        self.rect = None
+
+    def _is_valid(self):
+        return (
+            self.hwnd is not None and
+            win32gui.IsWindow(self.hwnd) and
+            win32gui.IsWindowVisible(self.hwnd)
+        )
 
-    def set_safe_place(self, x, y):
+    def validate(self) -> bool:
         """
-        :param x: 안전한 곳이라고 표시할 x위치
-        :param y: 안전한 곳이라고 표시할 y위치
-        :return: bool - 제대로 선택했는지에 대해서 확인
+        :return: 게임 창이 있으면 True
         """
-        raise NotImplementedError
-
-    def set_mine_place(self, x, y):
-        raise NotImplementedError
+        if not self._is_valid():
+            self._find_window()
+            if self.hwnd is None:
+                return False
+
+        try:
+            rect = win32gui.GetWindowRect(self.hwnd)
+        except win32gui.error:
+            self.hwnd = None
+            return False
 
-    def reset(self):
-        raise NotImplementedError
+        if rect != self.rect:
+            window_width = rect[2] - rect[0]
+            self.rect = rect
+            self.board_box = board_box(window_width, self.width, self.height)
+            self.game_over_box = game_over_box(window_width)
 
-    def wait(self):
-        raise NotImplementedError
+        return True
 
+    def cell_box(self, x, y):
+        """
+        :return: 창 왼쪽 위 기준의 (x, y) cell 영역
+        """
+        left = self.board_box[0] + x * CELL_SIZE
+        top = self.board_box[1] + y * CELL_SIZE
+        return left, top, left + CELL_SIZE, top + CELL_SIZE
 
-class LazyScreenshot:
-    def __init__(self, hwnd):
-        self.hwnd = hwnd
-        self.screenshot = None
-        self.loaded = False
+    def cell_center(self, x, y):
+        """
+        :return: (x, y) cell 가운데의 화면 좌표
+        """
+        return (
+            self.rect[0] + self.board_box[0] + x * CELL_SIZE + CELL_SIZE // 2,
+            self.rect[1] + self.board_box[1] + y * CELL_SIZE + CELL_SIZE // 2
+        )
 
-    def _check_loaded(self):
-        if self.loaded:
-            return
+    def game_over_center(self):
+        left, top, right, bottom = self.game_over_box
+        return (
+            self.rect[0] + (left + right) // 2,
+            self.rect[1] + (top + bottom) // 2
+        )
 
-        rect = win32gui.GetWindowRect(self.hwnd)
-        self.screenshot = ImageGrab.grab(rect, all_screens=True)
-        self.loaded = True
 
-    def crop(self, box):
-        self._check_loaded()
-        return self.screenshot.crop(box)
+class MinesweeperWindowInterface(GameInterfaceBase):
+    """
+    :param source: 화면을 가져올 곳. None이면 ScreenCapture를 쓴다.
+    """
 
+    # 안전한 곳을 모두 열면 끝나므로 깃발은 없어도 된다.
+    flag_to_win = False
 
-class MinesweeperWindowInterface(GameInterfaceBase):
-    def __init__(self):
+    def __init__(self, source=None):
         super().__init__()
 
+        self.source = source
+
         self.is_loaded = False
 
         self.width = 30
@@ -106,31 +129,29 @@ class MinesweeperWindowInterface(GameInterfaceBase):
         self.mine_count = 99
         self.place_info = [['-'] * self.width for _ in range(self.height)]
         self.is_game_over = False
+        self.change_log = ChangeLog()
 
         self.string_list = '012345xxx!->'
 
-        self.block_info = list(self._load_block_info())
-
-    def _load_block_info(self):
-        if not Path('mine_checker.png').exists():
-            return
+        self.block_info = self._load_block_info()
+        self.board_recognizer = self._create_recognizer()
 
-        canvas = Image.open('mine_checker.png')
-        width, height = canvas.size
-        width, height = width // 4, height // 4
+        self.session = WindowSession(
+            self.width, self.height, self._is_game_title
+        )
+        self.settle = SettleDetector()
+        self.board_checksum = None
 
-        for i, t in enumerate(self.string_list):
-            if t == 'x':
-                continue
+    def _create_recognizer(self):
+        if not self.block_info:
+            return None
+        return BoardRecognizer(self.block_info)
 
-            y, x = divmod(i, 4)
+    def _load_block_info(self):
+        if not Path('mine_checker.png').exists():
+            return []
 
-            yield canvas.crop(
-                (
-                    width * x, height * y,
-                    width * (x + 1), height * (y + 1)
-                )
-            ), t
+        return load_block_info('mine_checker.png', self.string_list)
 
     def _is_game_title(self, name: str) -> bool:
         name = name.lower().strip()
@@ -169,71 +190,56 @@ class MinesweeperWindowInterface(GameInterfaceBase):
         canvas.paste(subimage, (w * x, h * y))
         canvas.save('mine_checker.png')
 
-    def _detect_game_rect(self, hwnd, result):
-        # 열려있는지 확인
-        if not win32gui.IsWindowVisible(hwnd):
-            return
+        self.block_info = self._load_block_info()
+        self.board_recognizer = self._create_recognizer()
 
-        # Game 화면인지 확인
-        title: str = win32gui.GetWindowText(hwnd)
-        if not self._is_game_title(title):
+    def _run(self, callback_list):
+        if not self.session.validate():
             return
 
-        # 스크린샷 찍기
-        rect = win32gui.GetWindowRect(hwnd)
-        screenshot = LazyScreenshot(hwnd)
+        # 스크린샷은 callback이 영역을 요청할 때 그 부분만 찍는다.
+        if self.source is None:
+            self.source = ScreenCapture()
+        screenshot = WindowFrame(self.source, self.session.rect)
 
         # callback 실행하기
-        for callback in result:
-            callback(rect, screenshot)
-
-    def _load_game_info(self, rect, screenshot):
-        middle = (rect[2] - rect[0]) // 2
+        for callback in callback_list:
+            callback(self.session, screenshot)
 
+    def _load_game_info(self, session, screenshot):
         # 게임오버 되었는지 확인하기
         square = 15
         size = square * 2, square * 2
         self.is_game_over = self._color_check(
             screenshot,
-            (middle - square, 200 - square, middle + square, 200 + square),
+            session.game_over_box,
             [
                 (Image.new('RGB', size, (255, 0, 0)), True),
                 (Image.new('RGB', size, (0, 255, 0)), False)
             ]
         )
 
-        mine = 25
-        offset_x = self.width * mine // 2
-        offset_y = 240
-        padding = 0
-
-        for x, y in self._iter_range():
-            left = middle - offset_x + x * mine
-            top = offset_y + y * mine
-
-            result = self._color_check(
-                screenshot,
-                (
-                    left + padding, top + padding,
-                    left + mine - padding, top + mine - padding
-                ),
-                self.block_info
-            )
-            self.place_info[y][x] = result
+        # board 영역만 찍어서 전체 cell을 같이 비교한다.
+        symbol_list = self.board_recognizer.recognize(
+            screenshot.grab(session.board_box)
+        )
 
-    def _save_digit_num(self, rect, screenshot):
-        middle = (rect[2] - rect[0]) // 2
+        for y, row in enumerate(symbol_list):
+            for x, result in enumerate(row):
+                if self.place_info[y][x] != result:
+                    self.place_info[y][x] = result
+                    self.change_log.add(x, y)
 
-        mine = 25
-        offset_x = self.width * mine // 2
-        offset_y = 240
+    def _save_digit_num(self, session, screenshot):
+        mine = CELL_SIZE
+        offset_x, offset_y = session.board_box[:2]
         padding = 0
 
         temp_number_info = {
             (0, 0): '>'
         }
         for (x, y), v in temp_number_info.items():
-            left = middle - offset_x + x * mine
+            left = offset_x + x * mine
             top = offset_y + y * mine
 
             self._save_info(
@@ -245,13 +251,8 @@ class MinesweeperWindowInterface(GameInterfaceBase):
                 v
             )
 
-    def _iter_range(self):
-        for x in range(self.width):
-            for y in range(self.height):
-                yield x, y
-
     def _load_screen_info(self):
-        win32gui.EnumWindows(self._detect_game_rect, [self._load_game_info])
+        self._run([self._load_game_info])
 
     def _check_init(self):
         if not self.is_loaded:
@@ -264,28 +265,36 @@ class MinesweeperWindowInterface(GameInterfaceBase):
             mine_count=self.mine_count,
             width=self.width, height=self.height,
             mine_info=[''.join(row) for row in self.place_info],
-            is_game_over=self.is_game_over
+            is_game_over=self.is_game_over,
+            try_count=0,
+            succeed_count=0,
+            revision=self.change_log.revision
         )
 
-    def _click_save_place(self, x, y, down, up, rect, screenshot):
-        middle = (rect[2] - rect[0]) // 2
-        mine = 25
-        offset_x = self.width * mine // 2
-        offset_y = 240
+    def get_changes(self, revision):
+        self._check_init()
+        return self.change_log.get_changes(
+            revision, self.place_info, self.is_game_over
+        )
+
+    def _click_save_place(self, x, y, down, up, session, screenshot):
+        # 누른 cell만 보고 바뀐 뒤 멈출 때까지 기다린다.
+        grab = functools.partial(screenshot.grab, session.cell_box(x, y))
+        before = checksum(grab())
+        self._click_place(x, y, down, up, session, screenshot)
+        self.settle.wait(grab, before)
 
-        left = rect[0] + middle - offset_x + x * mine + mine // 2
-        top = rect[1] + offset_y + y * mine + mine // 2
+    def _click_place(self, x, y, down, up, session, screenshot):
+        left, top = session.cell_center(x, y)
 
         win32api.SetCursorPos((left, top))
         win32api.mouse_event(down, left, top, 0, 0)
         win32api.mouse_event(up, left, top, 0, 0)
-        time.sleep(0.5)
 
     def set_safe_place(self, x, y) -> bool:
         print('Save Place :', x, y)
         self.is_loaded = False
-        win32gui.EnumWindows(
-            self._detect_game_rect,
+        self._run(
             [functools.partial(
                 self._click_save_place,
                 x, y,
@@ -294,13 +303,70 @@ class MinesweeperWindowInterface(GameInterfaceBase):
         )
         return True
 
+    def set_place_batch(self, safe_list, mine_list):
+        # 모두 클릭한 다음에 한번만 기다린다.
+        self.is_loaded = False
+        callback_list = [
+            functools.partial(
+                self._click_place,
+                x, y,
+                win32con.MOUSEEVENTF_LEFTDOWN, win32con.MOUSEEVENTF_LEFTUP
+            )
+            for x, y in safe_list
+        ] + [
+            functools.partial(
+                self._click_place,
+                x, y,
+                win32con.MOUSEEVENTF_RIGHTDOWN, win32con.MOUSEEVENTF_RIGHTUP
+            )
+            for x, y in mine_list
+        ]
+        self._run(
+            [self._save_board_checksum] + callback_list + [self._wait_click]
+        )
+
+    def _save_board_checksum(self, session, screenshot):
+        self.board_checksum = checksum(screenshot.grab(session.board_box))
+
+    def set_chord_place(self, x, y, open_list):
+        # 가운데 버튼 클릭이 chord 이다.
+        self.is_loaded = False
+        self._run([
+            self._save_board_checksum,
+            functools.partial(
+                self._click_place,
+                x, y,
+                win32con.MOUSEEVENTF_MIDDLEDOWN, win32con.MOUSEEVENTF_MIDDLEUP
+            ),
+            self._wait_click
+        ])
+
+    def _wait_click(self, session, screenshot):
+        self.settle.wait(
+            functools.partial(screenshot.grab, session.board_box),
+            self.board_checksum
+        )
+
     def save_digit(self):
-        win32gui.EnumWindows(self._detect_game_rect, [self._save_digit_num])
+        self._run([self._save_digit_num])
+
+    def _save_frame(self, path, session, screenshot):
+        rect = session.rect
+        screenshot.crop((0, 0, rect[2] - rect[0], rect[3] - rect[1])).save(
+            path
+        )
+
+    def save_frame(self, path):
+        """
+        창 화면 전체를 png로 저장한다. FrameSource로 다시 읽을 수 있다.
+        """
+        self._run(
+            [functools.partial(self._save_frame, path)]
+        )
 
     def set_mine_place(self, x, y):
         print('Dangerous Place :', x, y)
-        win32gui.EnumWindows(
-            self._detect_game_rect,
+        self._run(
             [functools.partial(
                 self._click_save_place,
                 x, y,
@@ -308,16 +374,13 @@ class MinesweeperWindowInterface(GameInterfaceBase):
             )]
         )
 
-    def _reset_game(self, rect, screenshot):
-        middle = (rect[2] + rect[0]) // 2
-        top = rect[1] + 200
+    def _reset_game(self, session, screenshot):
+        self._save_board_checksum(session, screenshot)
+        middle, top = session.game_over_center()
         win32api.SetCursorPos((middle, top))
         win32api.mouse_event(win32con.MOUSEEVENTF_LEFTDOWN, middle, top, 0, 0)
         win32api.mouse_event(win32con.MOUSEEVENTF_LEFTUP, middle, top, 0, 0)
-        time.sleep(0.5)
+        self._wait_click(session, screenshot)
 
     def reset(self):
-        win32gui.EnumWindows(
-            self._detect_game_rect,
-            [self._reset_game]
-        )
+        self._run([self._reset_game])
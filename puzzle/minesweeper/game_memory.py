@@ -0,0 +1,309 @@
+import random
+from typing import Optional
+
+from puzzle.game import ChangeLog, GameInfo, GameInterfaceBase
+from puzzle.minesweeper.board import (FIRST_SAFE, BoardCorpus,
+                                      BoardGenerator, check_corpus)
+from puzzle.minesweeper.geometry import SQUARE, get_geometry
+from puzzle.minesweeper.reveal import RevealEngine
+
+
+class MemoryInterface(GameInterfaceBase):
+    """
+    화면 없이 메모리 안에서만 진행하는 게임.
+    규칙은 PygameInterface와 같고, 그리는 것만 하지 않는다.
+
+    게임오버 확인을 위해 확인하지 않은 칸, 깃발, 맞게 꽂은 깃발 수를
+    cell이 바뀔 때마다 갱신한다.
+    self_check가 True면 매번 전체 board를 다시 세서 counter와 비교한다. (test 용)
+    flag_to_win이 False면 깃발 없이 안전한 곳을 모두 열어도 이긴다.
+
+    칸을 여는 것은 지뢰를 깔 때 만드는 RevealEngine이 맡는다.
+
+    지뢰는 판마다 seed(game_seed)를 정해서 BoardGenerator로 깐다.
+    corpus를 주면 미리 만들어 둔 board를 차례로 쓴다.
+    """
+
+    def __init__(self, width, height, mine_count, seed=None,
+                 geometry=SQUARE, self_check=False, policy=FIRST_SAFE,
+                 corpus: Optional[BoardCorpus] = None, flag_to_win=True):
+        self.width = width
+        self.height = height
+        self.mine_count = mine_count
+        self.geometry = get_geometry(width, height, geometry)
+        self.self_check = self_check
+        self.flag_to_win = flag_to_win
+
+        self.generator = BoardGenerator(
+            width, height, mine_count, geometry, policy
+        )
+        if corpus is not None:
+            check_corpus(
+                corpus, width, height, mine_count, geometry, policy
+            )
+        self.corpus = corpus
+        self.game_seed = None
+        self.game_index = 0
+
+        self.mine_position = set()
+        self.reveal_engine = None
+
+        self.mine_info = [
+            ['-'] * width
+            for _ in range(height)
+        ]
+        self.is_init = False
+        self.is_game_over = False
+        self.is_good = False
+        self.try_count = 0
+        self.succeed_count = 0
+        self.change_log = ChangeLog()
+        self.random = random.Random(seed)
+
+        self.reset()
+
+    def get_info(self) -> GameInfo:
+        return GameInfo(
+            mine_count=self.mine_count,
+            width=self.width,
+            height=self.height,
+            is_game_over=self.is_game_over,
+            mine_info=[''.join(row) for row in self.mine_info],
+            try_count=self.try_count,
+            succeed_count=self.succeed_count,
+            revision=self.change_log.revision,
+            geometry=self.geometry.kind
+        )
+
+    def get_changes(self, revision):
+        return self.change_log.get_changes(
+            revision, self.mine_info, self.is_game_over
+        )
+
+    def _set_cell(self, x, y, value):
+        old = self.mine_info[y][x]
+        if old == '-':
+            self.unknown_count -= 1
+        elif old == '>':
+            self.flag_count -= 1
+            if (x, y) in self.mine_position:
+                self.correct_flag_count -= 1
+
+        if value == '-':
+            self.unknown_count += 1
+        elif value == '>':
+            self.flag_count += 1
+            if (x, y) in self.mine_position:
+                self.correct_flag_count += 1
+
+        self.mine_info[y][x] = value
+        self.change_log.add(x, y)
+
+    def set_safe_place(self, x, y):
+        if self.is_game_over:
+            return
+
+        # 다 잘 눌렀는지 확인
+        if self._open_place(x, y) > 0:
+            self._check_is_over()
+
+    def set_place_batch(self, safe_list, mine_list):
+        if self.is_game_over:
+            return
+
+        changed = 0
+        for x, y in safe_list:
+            changed += self._open_place(x, y)
+            if self.is_game_over:
+                return
+
+        for x, y in mine_list:
+            changed += self._flag_place(x, y)
+
+        # 게임오버 확인과 그리기는 batch 마다 한번만 한다.
+        if changed > 0:
+            self._check_is_over()
+
+    def set_chord_place(self, x, y, open_list):
+        # 숫자와 주변 깃발 수가 같을 때만 깃발이 없는 주변 칸을 연다.
+        if self.is_game_over:
+            return
+
+        value = self.mine_info[y][x]
+        if not value.isdigit():
+            return
+
+        adj_list = list(self.geometry.adj_pos(x, y))
+        flag_count = sum(
+            1 for xx, yy in adj_list if self.mine_info[yy][xx] == '>'
+        )
+        if flag_count != int(value):
+            return
+
+        self.set_place_batch(
+            [(xx, yy) for xx, yy in adj_list if self.mine_info[yy][xx] == '-'],
+            []
+        )
+
+    def _open_place(self, x, y):
+        """
+        :return: 새로 열린 cell 갯수
+        """
+        if not self.is_init:
+            # 첫번째 클릭에서는 무조건 지뢰가 나오지 않도록 한다.
+            self._init_mine_position(x, y)
+
+        if (x, y) in self.mine_position:
+            self.is_game_over = True
+            self.is_good = False
+            self._set_cell(x, y, '!')
+            self.try_count += 1
+            for xx, yy in self.mine_position:
+                if self.mine_info[yy][xx] == '-':
+                    self._set_cell(xx, yy, '*')
+            self._draw()
+            return 0
+
+        if self.mine_info[y][x] != '-':
+            return 0
+
+        # 연쇄적으로 열리는 것은 engine이 새로 열린 cell만 알려준다.
+        engine = self.reveal_engine
+        width = self.width
+        open_list = engine.reveal(y * width + x)
+        pos_list = [
+            (cell_id % width, cell_id // width)
+            for cell_id in open_list
+        ]
+        adj_count = engine.adj_count
+        mine_info = self.mine_info
+        for (xx, yy), cell_id in zip(pos_list, open_list):
+            mine_info[yy][xx] = str(adj_count[cell_id])
+
+        # 열린 cell은 모두 '-' 였으므로 _set_cell을 거치지 않고 한번에 센다.
+        self.unknown_count -= len(open_list)
+        self.change_log.extend(pos_list)
+        return len(open_list)
+
+    def _check_is_over(self):
+        if self.self_check:
+            self._verify_counter()
+
+        if self.flag_to_win:
+            self.is_game_over = self.unknown_count == 0
+        else:
+            # 지뢰가 아닌 곳이 모두 열리면 끝난다.
+            self.is_game_over = (
+                self.unknown_count + self.flag_count == self.mine_count
+            )
+
+        if self.is_game_over:
+            self.is_good = not self.flag_to_win or (
+                self.flag_count == self.mine_count and
+                self.correct_flag_count == self.mine_count
+            )
+            self.try_count += 1
+            if self.is_good:
+                self.succeed_count += 1
+        # self._show_info()
+        self._draw()
+
+    def _verify_counter(self):
+        total = ''.join(
+            cell
+            for row in self.mine_info for cell in row
+        )
+        correct_flag_count = sum(
+            1
+            for x, y in self.mine_position
+            if self.mine_info[y][x] == '>'
+        )
+        assert self.unknown_count == total.count('-'), 'unknown_count'
+        assert self.flag_count == total.count('>'), 'flag_count'
+        assert self.correct_flag_count == correct_flag_count, \
+            'correct_flag_count'
+
+    def _init_mine_position(self, x, y):
+        if self.corpus is not None:
+            id_list = self.corpus.get_mine_list(
+                self.game_index % len(self.corpus), (x, y)
+            )
+        else:
+            id_list = self.generator.generate(self.game_seed, (x, y))
+        self.game_index += 1
+
+        self._set_mine_position([
+            self.geometry.to_pos(cell_id)
+            for cell_id in id_list
+        ])
+
+    def _set_mine_position(self, position_list):
+        self.mine_position = set(position_list)
+        self.is_init = True
+
+        self.reveal_engine = RevealEngine(
+            self.geometry,
+            [self.geometry.to_id(x, y) for x, y in self.mine_position]
+        )
+
+        # 지뢰를 깔기 전에 꽂은 깃발이 있으면 다시 센다.
+        if self.flag_count:
+            self.correct_flag_count = sum(
+                1
+                for x, y in self.mine_position
+                if self.mine_info[y][x] == '>'
+            )
+            for y, row in enumerate(self.mine_info):
+                for x, cell in enumerate(row):
+                    if cell == '>':
+                        self.reveal_engine.set_flag(
+                            self.geometry.to_id(x, y)
+                        )
+
+    def _show_info(self):
+        print(self.is_game_over, self.is_good)
+        for y, row in enumerate(self.mine_info):
+            cell_list = []
+            for x, cell in enumerate(row):
+                if (x, y) in self.mine_position:
+                    cell += '!'
+                else:
+                    cell += ' '
+                cell_list.append(cell)
+            print(''.join(cell_list))
+        input()
+
+    def set_mine_place(self, x, y):
+        if self._flag_place(x, y) > 0:
+            self._check_is_over()
+
+    def _flag_place(self, x, y):
+        if self.mine_info[y][x] == '-':
+            self._set_cell(x, y, '>')
+            if self.reveal_engine is not None:
+                self.reveal_engine.set_flag(self.geometry.to_id(x, y))
+            return 1
+        return 0
+
+    def reset(self):
+        self.mine_position = set()
+        self.reveal_engine = None
+        self.mine_info = [
+            ['-'] * self.width
+            for _ in range(self.height)
+        ]
+        self.unknown_count = self.width * self.height
+        self.flag_count = 0
+        self.correct_flag_count = 0
+        self.is_init = False
+        self.is_game_over = False
+        self.is_good = False
+        self.game_seed = self.random.getrandbits(63)
+        self.change_log.reset()
+        self._draw()
+
+    def _draw(self):
+        pass
+
+    def wait(self):
+        pass
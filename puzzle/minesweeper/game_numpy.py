@@ -0,0 +1,246 @@
+import random
+
+import numpy as np
+
+from puzzle.game import (ChangeLog, GameChangeInfo, GameInfo,
+                         GameInterfaceBase, full_change_info)
+from puzzle.minesweeper.board import FIRST_SAFE, BoardGenerator
+from puzzle.minesweeper.geometry import SQUARE, BoardGeometry, get_geometry
+
+# state 값. 0 ~ 8 은 열린 칸의 주변 지뢰 갯수
+UNKNOWN = 9
+FLAG = 10
+WRONG = 11
+MINE = 12
+
+SYMBOL = '012345678->!*'
+SYMBOL_ARRAY = np.array(list(SYMBOL))
+
+
+def count_adj_mine(mine, geometry: BoardGeometry = None):
+    """
+    8방향으로 한칸씩 민 지뢰 배열을 더해서 (3x3 convolution) 주변 지뢰 갯수를 구한다.
+    square가 아닌 geometry는 이웃 table을 따라 더한다.
+    """
+    if geometry is not None and geometry.kind != SQUARE:
+        neighbor = np.frombuffer(geometry.neighbor, np.int32)
+        offset = np.frombuffer(geometry.offset, np.int32)
+        mine_count = mine.ravel().astype(np.uint8)[neighbor]
+        total = np.concatenate([[0], np.cumsum(mine_count, dtype=np.int32)])
+        return (total[offset[1:]] - total[offset[:-1]]).astype(
+            np.uint8
+        ).reshape(mine.shape)
+
+    height, width = mine.shape
+    padded = np.pad(mine.astype(np.uint8), 1)
+    adj_count = np.zeros((height, width), np.uint8)
+
+    for dy in range(3):
+        for dx in range(3):
+            if dy == 1 and dx == 1:
+                continue
+            adj_count += padded[dy:dy + height, dx:dx + width]
+
+    return adj_count
+
+
+class NumpyInterface(GameInterfaceBase):
+    """
+    NumPy 배열로 board를 들고 있는 게임. 규칙은 MemoryInterface와 같다.
+
+    state : uint8 (height, width), 값은 위의 UNKNOWN, FLAG, ... 참고
+    mine : bool (height, width)
+    adj_count : 지뢰를 깐 다음 한번만 계산하는 주변 지뢰 갯수
+    """
+
+    def __init__(self, width, height, mine_count, seed=None,
+                 geometry=SQUARE, policy=FIRST_SAFE):
+        self.width = width
+        self.height = height
+        self.mine_count = mine_count
+        self.geometry = get_geometry(width, height, geometry)
+        self.generator = BoardGenerator(
+            width, height, mine_count, geometry, policy
+        )
+
+        self.try_count = 0
+        self.succeed_count = 0
+        self.change_log = ChangeLog()
+        # 같은 seed면 MemoryInterface와 같은 board가 나온다.
+        self.random = random.Random(seed)
+
+        self.reset()
+
+    def reset(self):
+        shape = self.height, self.width
+        self.state = np.full(shape, UNKNOWN, np.uint8)
+        self.mine = np.zeros(shape, bool)
+        self.adj_count = np.zeros(shape, np.uint8)
+
+        # state를 python에서 한칸씩 읽고 쓸 때 쓰는 flat view
+        self._state_view = memoryview(self.state).cast(
+            'B', (self.state.size,)
+        )
+        self._adj_list = []
+
+        self.unknown_count = self.state.size
+        self.flag_count = 0
+
+        self.is_init = False
+        self.is_game_over = False
+        self.is_good = False
+        self.game_seed = self.random.getrandbits(63)
+        self.change_log.reset()
+
+    def wait(self):
+        pass
+
+    def _mine_info(self):
+        rows = SYMBOL_ARRAY[self.state].view(f'<U{self.width}')
+        return rows.ravel().tolist()
+
+    def get_info(self) -> GameInfo:
+        return GameInfo(
+            mine_count=self.mine_count,
+            width=self.width,
+            height=self.height,
+            is_game_over=self.is_game_over,
+            mine_info=self._mine_info(),
+            try_count=self.try_count,
+            succeed_count=self.succeed_count,
+            revision=self.change_log.revision,
+            geometry=self.geometry.kind
+        )
+
+    def get_changes(self, revision):
+        pos_list = self.change_log.since(revision)
+        if pos_list is None:
+            return full_change_info(
+                self.change_log.revision,
+                self._mine_info(),
+                self.is_game_over
+            )
+
+        view = self._state_view
+        width = self.width
+        return GameChangeInfo(
+            revision=self.change_log.revision,
+            is_game_over=self.is_game_over,
+            is_full=False,
+            cell_list=[
+                (x, y, SYMBOL[view[y * width + x]])
+                for x, y in pos_list
+            ]
+        )
+
+    def set_safe_place(self, x, y):
+        if self.is_game_over:
+            return
+
+        if self._open_place(x, y) > 0:
+            self._check_is_over()
+
+    def set_mine_place(self, x, y):
+        if self._flag_place(x, y) > 0:
+            self._check_is_over()
+
+    def set_place_batch(self, safe_list, mine_list):
+        if self.is_game_over:
+            return
+
+        changed = 0
+        for x, y in safe_list:
+            changed += self._open_place(x, y)
+            if self.is_game_over:
+                return
+
+        for x, y in mine_list:
+            changed += self._flag_place(x, y)
+
+        if changed > 0:
+            self._check_is_over()
+
+    def _init_mine_position(self, x, y):
+        self.mine.flat[self.generator.generate(self.game_seed, (x, y))] = True
+        self.adj_count = count_adj_mine(self.mine, self.geometry)
+        self._adj_list = self.adj_count.ravel().tolist()
+        self.is_init = True
+
+    def _open_place(self, x, y):
+        """
+        :return: 새로 열린 cell 갯수
+        """
+        if not self.is_init:
+            self._init_mine_position(x, y)
+
+        view = self._state_view
+        width = self.width
+        start = y * width + x
+
+        if self.mine[y, x]:
+            self._explode(x, y)
+            return 0
+
+        if view[start] != UNKNOWN:
+            return 0
+
+        # 연쇄적으로 열리는 것 구현. 열린 cell만큼만 일한다.
+        adj = self._adj_list
+        offset = self.geometry.offset
+        neighbor = self.geometry.neighbor
+        view[start] = adj[start]
+        opened = [start]
+        stack = [start] if adj[start] == 0 else []
+
+        while stack:
+            i = stack.pop()
+            for j in neighbor[offset[i]:offset[i + 1]]:
+                if view[j] != UNKNOWN:
+                    continue
+
+                view[j] = adj[j]
+                opened.append(j)
+                if adj[j] == 0:
+                    stack.append(j)
+
+        self.unknown_count -= len(opened)
+        for i in opened:
+            yy, xx = divmod(i, width)
+            self.change_log.add(xx, yy)
+
+        return len(opened)
+
+    def _explode(self, x, y):
+        self.is_game_over = True
+        self.is_good = False
+        self.try_count += 1
+
+        self.state[y, x] = WRONG
+        self.change_log.add(x, y)
+
+        hidden = self.mine & (self.state == UNKNOWN)
+        self.state[hidden] = MINE
+        for yy, xx in zip(*np.nonzero(hidden)):
+            self.change_log.add(int(xx), int(yy))
+
+    def _flag_place(self, x, y):
+        i = y * self.width + x
+        if self._state_view[i] != UNKNOWN:
+            return 0
+
+        self._state_view[i] = FLAG
+        self.unknown_count -= 1
+        self.flag_count += 1
+        self.change_log.add(x, y)
+        return 1
+
+    def _check_is_over(self):
+        self.is_game_over = self.unknown_count == 0
+        if self.is_game_over:
+            self.is_good = (
+                self.flag_count == self.mine_count and
+                bool(np.all(self.state[self.mine] == FLAG))
+            )
+            self.try_count += 1
+            if self.is_good:
+                self.succeed_count += 1
@@ -1,11 +1,19 @@
-import random
+import threading
+from typing import Optional
 
 import pygame
 
-from puzzle.game import GameInfo, GameInterfaceBase
+from puzzle.game import GameInfo
+from puzzle.minesweeper.game_memory import MemoryInterface
 
 
 class PygameCanvas:
+    """
+    board 크기가 바뀌거나 새 게임이면 화면 전체를 그리고,
+    그 외에는 바뀐 cell만 board 위에 다시 그려서 그 영역만 화면에 올린다.
+    숫자, 깃발, 지뢰는 미리 그려둔 glyph를 붙이기만 한다.
+    """
+
     def __init__(self):
         pygame.init()
         self.screen = pygame.display.set_mode((1920, 1080))
@@ -18,6 +26,11 @@ class PygameCanvas:
             pygame.image.load('check.png'),
             (28, 28)
         )
+        self.glyph_map = self._build_glyph_map()
+
+        self.layout = None
+        self.subsurfaces = None
+        self.stats = None
 
     def __del__(self):
         pygame.quit()
@@ -67,7 +80,27 @@ class PygameCanvas:
         self.screen.fill('black', box)
         return self.screen.subsurface(box)
 
-    def draw(self, info: GameInfo):
+    def draw(self, info: GameInfo, changed_list=None):
+        self.render(info, changed_list)
+
+        pygame.event.get()
+        if info.is_game_over:
+            self.clock.tick(1)
+        else:
+            self.clock.tick(15)
+
+    def render(self, info: GameInfo, changed_list=None):
+        """
+        :param changed_list: 지난번 그린 뒤로 바뀐 (x, y) 목록.
+            None이면 전체를 다시 그린다.
+        """
+        if changed_list is None or \
+                self.layout != (info.width, info.height):
+            self._draw_full(info)
+        else:
+            self._draw_dirty(info, changed_list)
+
+    def _draw_full(self, info):
         self.screen.fill('black')
 
         subsurfaces = self._get_subsurface_info(info)
@@ -82,12 +115,52 @@ class PygameCanvas:
             for i, cell in enumerate(row):
                 self._draw_cell(subsurfaces['place'], i, j, cell, size)
 
-        pygame.event.get()
+        self.layout = info.width, info.height
+        self.subsurfaces = subsurfaces
+        self.stats = info.succeed_count, info.try_count
         pygame.display.flip()
-        if info.is_game_over:
-            self.clock.tick(1)
-        else:
-            self.clock.tick(15)
+
+    def _draw_dirty(self, info, changed_list):
+        size = 32
+        place = self.subsurfaces['place']
+        offset_x, offset_y = place.get_abs_offset()
+
+        rect_list = []
+        for x, y in changed_list:
+            self._draw_cell(place, x, y, info.mine_info[y][x], size)
+            rect_list.append(pygame.Rect(
+                offset_x + x * size, offset_y + y * size, size, size
+            ))
+
+        stats = info.succeed_count, info.try_count
+        if stats != self.stats:
+            screen = self.subsurfaces['stats']
+            screen.fill('black')
+            self._draw_stats(screen, info)
+            rect_list.append(pygame.Rect(
+                screen.get_abs_offset(), screen.get_size()
+            ))
+            self.stats = stats
+
+        if rect_list:
+            pygame.display.update(rect_list)
+
+    def _build_glyph_map(self):
+        size = 32
+        glyph_map = {
+            cell: self.font.render(cell, True, color)
+            for cell, color in self._number_to_color.items()
+        }
+        glyph_map['>'] = self.check_image
+
+        for cell, ratio in [('!', 1), ('*', 0.7)]:
+            surface = pygame.Surface((size, size), pygame.SRCALPHA)
+            pygame.draw.circle(
+                surface, 'red', (size // 2, size // 2), size * 2 / 5 * ratio
+            )
+            glyph_map[cell] = surface
+
+        return glyph_map
 
     _number_to_color = {
         '1': (255, 255, 0),
@@ -101,31 +174,16 @@ class PygameCanvas:
     }
 
     def _draw_cell(self, screen, x, y, cell, size):
-        if cell == '-':
-            return
-
         this_box = [x * size, y * size, size, size]
 
         if cell.isdigit():
             screen.fill((64, 64, 64), this_box)
-            if 1 <= int(cell):
-                text_surface = self.font.render(
-                    cell, True,
-                    self._number_to_color[cell]
-                )
-                self._blit_center(screen, text_surface, this_box)
-        elif cell == '>':
-            self._blit_center(screen, self.check_image, this_box)
-        elif cell in '!*':
-            radius = size * 2 / 5
-            if cell == '*':
-                radius *= 0.7
-            pygame.draw.circle(
-                screen,
-                'red',
-                pygame.Rect(this_box).center,
-                radius
-            )
+        else:
+            screen.fill('black', this_box)
+
+        glyph = self.glyph_map.get(cell)
+        if glyph is not None:
+            self._blit_center(screen, glyph, this_box)
 
     def _draw_info(self, screen, info):
         text_surface = self.font.render(
@@ -182,157 +240,143 @@ class PygameCanvas:
             return main_pos + main_width - sub_width
 
 
-class PygameInterface(GameInterfaceBase):
-    def __init__(self, width, height, mine_count):
-        self.width = width
-        self.height = height
-        self.mine_count = mine_count
-
-        self.mine_position = set()
-
-        self.mine_info = [
-            ['-'] * width
-            for _ in range(height)
-        ]
-        self.is_init = False
-        self.is_game_over = False
-        self.is_good = False
-        self.try_count = 0
-        self.succeed_count = 0
-
-        self.canvas = PygameCanvas()
-
-        self.reset()
-
-    def get_info(self) -> GameInfo:
-        return GameInfo(
-            mine_count=self.mine_count,
-            width=self.width,
-            height=self.height,
-            is_game_over=self.is_game_over,
-            mine_info=[''.join(row) for row in self.mine_info],
-            try_count=self.try_count,
-            succeed_count=self.succeed_count
+class RenderThread(threading.Thread):
+    """
+    PygameCanvas를 따로 thread에서 만들고 fps 만큼만 그린다.
+
+    게임은 publish로 최신 상태를 넘기기만 하고 기다리지 않는다.
+    그리기 전에 여러 번 publish되면 마지막 상태만 그리고,
+    그 사이에 바뀐 cell은 모아서 같이 다시 그린다.
+    """
+
+    def __init__(self, fps=30):
+        super().__init__(daemon=True)
+        self.fps = fps
+        self.lock = threading.Lock()
+        self.pending = None
+        self.canvas = None
+        self.error: Optional[BaseException] = None
+        self.ready = threading.Event()
+        self.clicked = threading.Event()
+        self.stopped = threading.Event()
+
+        self.publish_count = 0
+        self.frame_count = 0
+
+    def publish(self, info: GameInfo, changed_list):
+        self.check_error()
+        with self.lock:
+            self.publish_count += 1
+            if self.pending is not None:
+                old_list = self.pending[1]
+                if old_list is None or changed_list is None:
+                    changed_list = None
+                else:
+                    changed_list = old_list + changed_list
+            self.pending = info, changed_list
+
+    def run(self):
+        # pygame 화면과 event는 만든 thread에서만 다룬다.
+        # 화면을 못 만들어도 기다리는 쪽이 멈추지 않도록 ready는 꼭 알린다.
+        try:
+            self.canvas = canvas = PygameCanvas()
+        except BaseException as e:
+            self.error = e
+            return
+        finally:
+            self.ready.set()
+        clock = pygame.time.Clock()
+
+        try:
+            while not self.stopped.is_set():
+                with self.lock:
+                    pending, self.pending = self.pending, None
+                if pending is not None:
+                    canvas.render(*pending)
+                    self.frame_count += 1
+
+                for event in pygame.event.get():
+                    if event.type == pygame.MOUSEBUTTONDOWN:
+                        self.clicked.set()
+                clock.tick(self.fps)
+        except BaseException as e:
+            # error를 먼저 남겨야 깨어난 wait_click이 그것을 본다.
+            self.error = e
+            self.stopped.set()
+            self.clicked.set()
+        finally:
+            self.canvas = None
+
+    def check_error(self):
+        """
+        그리다가 thread가 죽었으면 게임 thread에서 그 error를 다시 낸다.
+        """
+        if self.error is not None:
+            raise self.error
+
+    def wait_click(self):
+        self.check_error()
+        self.clicked.clear()
+        # clear 하기 전에 죽었으면 깨워줄 thread가 없다.
+        self.check_error()
+        self.clicked.wait()
+        self.check_error()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+class PygameInterface(MemoryInterface):
+    """
+    fps를 주면 RenderThread가 따로 그려서 게임 진행이 화면 속도에 묶이지 않는다.
+    """
+
+    def __init__(self, width, height, mine_count, seed=None,
+                 self_check=False, fps=None):
+        if fps is None:
+            self.canvas = PygameCanvas()
+            self.render_thread = None
+        else:
+            self.canvas = None
+            self.render_thread = RenderThread(fps)
+            self.render_thread.start()
+            self.render_thread.ready.wait()
+            if self.render_thread.error is not None:
+                self.render_thread.join()
+                self.render_thread.check_error()
+        self.draw_revision = 0
+
+        super().__init__(
+            width, height, mine_count, seed, self_check=self_check
         )
 
     def set_safe_place(self, x, y):
-        if self.is_game_over:
-            return
-
-        print('Safe', x, y)
-        if not self.is_init:
-            # 첫번째 클릭에서는 무조건 지뢰가 나오지 않도록 한다.
-            self._init_mine_position(x, y)
-
-        if (x, y) in self.mine_position:
-            self.is_game_over = True
-            self.is_good = False
-            self.mine_info[y][x] = '!'
-            self.try_count += 1
-            for xx, yy in self.mine_position:
-                if self.mine_info[yy][xx] == '-':
-                    self.mine_info[yy][xx] = '*'
-            self._draw()
-            return
-
-        # 연쇄적으로 열리는 것 구현
-        click_count = 0
-        queue = [(x, y)]
-        while queue:
-            xx, yy = queue.pop()
-            if self.mine_info[yy][xx] != '-':
-                continue
-
-            count = self._get_adj_mine(xx, yy)
-            self.mine_info[yy][xx] = str(count)
-            click_count += 1
-            if count == 0:
-                queue.extend(self._get_adj_list(xx, yy))
-
-        # 다 잘 눌렀는지 확인
-        if click_count > 0:
-            self._check_is_over()
-
-    def _check_is_over(self):
-        total = ''.join(
-            cell
-            for row in self.mine_info for cell in row
-        )
-        self.is_game_over = '-' not in total
-        if self.is_game_over:
-            self.is_good = (
-                total.count('>') == self.mine_count and
-                all(
-                    self.mine_info[y][x] == '>'
-                    for x, y in self.mine_position
-                )
-            )
-            self.try_count += 1
-            if self.is_good:
-                self.succeed_count += 1
-        # self._show_info()
-        self._draw()
-
-    def _get_adj_mine(self, x, y):
-        return len([
-            pos
-            for pos in self._get_adj_list(x, y)
-            if pos in self.mine_position
-        ])
-
-    def _get_adj_list(self, x, y):
-        for xx in range(x-1, x+2):
-            for yy in range(y-1, y+2):
-                if xx == x and yy == y:
-                    continue
-
-                if 0 <= xx < self.width:
-                    if 0 <= yy < self.height:
-                        yield xx, yy
-
-    def _init_mine_position(self, x, y):
-        position_list = [
-            (i, j)
-            for i in range(self.width)
-            for j in range(self.height)
-            if not (i == x and j == y)
-        ]
-        random.shuffle(position_list)
-        self.mine_position = set(position_list[:self.mine_count])
-        self.is_init = True
-
-    def _show_info(self):
-        print(self.is_game_over, self.is_good)
-        for y, row in enumerate(self.mine_info):
-            cell_list = []
-            for x, cell in enumerate(row):
-                if (x, y) in self.mine_position:
-                    cell += '!'
-                else:
-                    cell += ' '
-                cell_list.append(cell)
-            print(''.join(cell_list))
-        input()
+        if not self.is_game_over:
+            print('Safe', x, y)
+        super().set_safe_place(x, y)
 
     def set_mine_place(self, x, y):
         if self.mine_info[y][x] == '-':
-            self.mine_info[y][x] = '>'
             print('Mine', x, y)
-            self._check_is_over()
-
-    def reset(self):
-        self.mine_position = set()
-        self.mine_info = [
-            ['-'] * self.width
-            for _ in range(self.height)
-        ]
-        self.is_init = False
-        self.is_game_over = False
-        self.is_good = False
-        self._draw()
+        super().set_mine_place(x, y)
 
     def _draw(self):
-        self.canvas.draw(self.get_info())
+        # 새 게임이면 since가 None이라 전체를 그린다.
+        changed_list = self.change_log.since(self.draw_revision)
+        self.draw_revision = self.change_log.revision
+
+        if self.render_thread is not None:
+            self.render_thread.publish(self.get_info(), changed_list)
+        else:
+            self.canvas.draw(self.get_info(), changed_list)
 
     def wait(self):
-        self.canvas.wait()
+        if self.render_thread is not None:
+            self.render_thread.wait_click()
+        else:
+            self.canvas.wait()
+
+    def close(self):
+        if self.render_thread is not None:
+            self.render_thread.stop()
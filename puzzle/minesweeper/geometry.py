@@ -0,0 +1,91 @@
+import functools
+from array import array
+
+from puzzle.minesweeper.constraint import CellIndex
+
+SQUARE = 'square'
+TORUS = 'torus'
+HEX = 'hex'
+
+
+class BoardGeometry(CellIndex):
+    """
+    cell id 마다 이웃 cell id 목록을 CSR 형태로 한번만 만들어 둔다.
+    i 번 cell의 이웃 = neighbor[offset[i]:offset[i + 1]]
+
+    kind
+    - square : 8방향, 가장자리는 잘린다.
+    - torus : 8방향, 가장자리는 반대쪽과 이어진다.
+    - hex : 홀수 줄이 반칸 오른쪽으로 밀린 6방향 (odd-r offset 좌표)
+    """
+
+    def __init__(self, width, height, kind=SQUARE):
+        super().__init__(width, height)
+        self.kind = kind
+
+        self.offset = array('i', [0])
+        self.neighbor = array('i')
+
+        for cell_id in range(width * height):
+            x, y = self.to_pos(cell_id)
+            self.neighbor.extend(self._build_adj(x, y))
+            self.offset.append(len(self.neighbor))
+
+    def _build_adj(self, x, y):
+        if self.kind == SQUARE:
+            delta_list = self._square_delta()
+        elif self.kind == TORUS:
+            return self._torus_adj(x, y)
+        elif self.kind == HEX:
+            delta_list = self._hex_delta(y)
+        else:
+            raise ValueError(f'Unknown geometry : {self.kind}')
+
+        return [
+            (y + dy) * self.width + (x + dx)
+            for dx, dy in delta_list
+            if 0 <= x + dx < self.width and 0 <= y + dy < self.height
+        ]
+
+    def _square_delta(self):
+        return [
+            (dx, dy)
+            for dx in range(-1, 2)
+            for dy in range(-1, 2)
+            if dx != 0 or dy != 0
+        ]
+
+    def _torus_adj(self, x, y):
+        cell_id = y * self.width + x
+        result = []
+        for dx, dy in self._square_delta():
+            adj_id = (
+                (y + dy) % self.height * self.width +
+                (x + dx) % self.width
+            )
+            # 아주 작은 board에서는 같은 cell이 여러번 나올 수 있다.
+            if adj_id != cell_id and adj_id not in result:
+                result.append(adj_id)
+        return result
+
+    def _hex_delta(self, y):
+        if y % 2 == 0:
+            return [(-1, -1), (0, -1), (-1, 0), (1, 0), (-1, 1), (0, 1)]
+        else:
+            return [(0, -1), (1, -1), (-1, 0), (1, 0), (0, 1), (1, 1)]
+
+    def adj_id(self, cell_id):
+        return self.neighbor[self.offset[cell_id]:self.offset[cell_id + 1]]
+
+    def adj_pos(self, x, y):
+        width = self.width
+        for adj_id in self.adj_id(y * width + x):
+            yield adj_id % width, adj_id // width
+
+
+@functools.lru_cache(maxsize=32)
+def get_geometry(width, height, kind=SQUARE) -> BoardGeometry:
+    """
+    같은 크기의 board는 게임이 바뀌어도 같은 이웃 table을 쓴다.
+    """
+    return BoardGeometry(width, height, kind)
@@ -0,0 +1,177 @@
+from math import gcd
+from typing import Dict, List, Tuple
+
+from puzzle.minesweeper.constraint import BitRelation, iter_bit
+from puzzle.minesweeper.probability import split_component
+
+
+class LinearRow:
+    """
+    sum(coef[cell] * x[cell]) = rhs 인 일차방정식 한 줄. x는 0 또는 1
+    """
+
+    __slots__ = ('coef', 'rhs')
+
+    def __init__(self, coef: Dict[int, int], rhs):
+        self.coef = coef
+        self.rhs = rhs
+
+    @classmethod
+    def from_relation(cls, relation: BitRelation):
+        return cls(dict.fromkeys(iter_bit(relation.mask), 1), relation.count)
+
+    def __repr__(self):
+        return f'LinearRow({self.coef}, {self.rhs})'
+
+    def is_empty(self):
+        return not self.coef
+
+    def eliminate(self, other: 'LinearRow', cell_id) -> 'LinearRow':
+        """
+        other를 곱해서 빼서 cell_id의 계수를 0으로 만든 새 줄
+        """
+        a = self.coef[cell_id]
+        b = other.coef[cell_id]
+        coef = {k: v * b for k, v in self.coef.items()}
+        for k, v in other.coef.items():
+            value = coef.get(k, 0) - v * a
+            if value:
+                coef[k] = value
+            else:
+                coef.pop(k, None)
+        return LinearRow(coef, self.rhs * b - other.rhs * a)._normalize()
+
+    def substitute(self, value_map: Dict[int, int]) -> 'LinearRow':
+        coef = {}
+        rhs = self.rhs
+        for k, v in self.coef.items():
+            value = value_map.get(k)
+            if value is None:
+                coef[k] = v
+            else:
+                rhs -= v * value
+        return LinearRow(coef, rhs)
+
+    def propagate(self) -> Dict[int, int]:
+        """
+        각 변수가 0 또는 1인 것으로 좌변의 범위를 구해서 값이 정해지는 변수를 찾는다.
+        :return: cell id -> 0 또는 1
+        """
+        low = sum(v for v in self.coef.values() if v < 0)
+        high = sum(v for v in self.coef.values() if v > 0)
+        rhs = self.rhs
+
+        result = {}
+        for cell_id, v in self.coef.items():
+            if v > 0:
+                if low + v > rhs:
+                    result[cell_id] = 0
+                elif high - v < rhs:
+                    result[cell_id] = 1
+            else:
+                if high + v < rhs:
+                    result[cell_id] = 0
+                elif low - v > rhs:
+                    result[cell_id] = 1
+        return result
+
+    def _normalize(self):
+        if not self.coef:
+            return self
+
+        divisor = gcd(self.rhs, *self.coef.values())
+        if self.coef[min(self.coef)] < 0:
+            divisor = -divisor
+        if divisor != 1:
+            self.coef = {k: v // divisor for k, v in self.coef.items()}
+            self.rhs //= divisor
+        return self
+
+
+class LinearReducer:
+    """
+    관계들을 0/1 변수의 연립일차방정식으로 보고 가우스 소거법으로
+    기약 행사다리꼴(pivot cell -> 줄)을 만든 뒤,
+    각 줄의 값 범위로 지뢰와 안전한 곳을 찾는다.
+
+    찾은 값을 대입하면 pivot이 사라진 줄만 다시 소거하고 (incremental),
+    더 찾을 것이 없을 때까지 반복한다.
+    부분집합 관계가 아니라 겹치기만 하는 관계에서도 찾을 수 있다.
+    """
+
+    def __init__(self):
+        self.step_count = 0
+
+    def deduce(self, relation_list: List[BitRelation]) -> Tuple[int, int]:
+        """
+        :return: (안전한 cell mask, 지뢰 cell mask)
+        """
+        relation_list = [
+            relation for relation in relation_list
+            if not relation.is_empty()
+        ]
+
+        safe_mask = 0
+        mine_mask = 0
+        for component in split_component(relation_list):
+            known = self._deduce_component(component)
+            for cell_id, value in known.items():
+                if value:
+                    mine_mask |= 1 << cell_id
+                else:
+                    safe_mask |= 1 << cell_id
+
+        return safe_mask, mine_mask
+
+    def _deduce_component(self, component) -> Dict[int, int]:
+        row_list = [LinearRow.from_relation(r) for r in component]
+        pivot_map: Dict[int, LinearRow] = {}
+        for row in row_list:
+            self._insert(pivot_map, row)
+
+        known: Dict[int, int] = {}
+        found = self._propagate(row_list, pivot_map)
+        while found:
+            known.update(found)
+
+            row_list = [row.substitute(found) for row in row_list]
+
+            # pivot이 그대로인 줄은 대입해도 행사다리꼴이 유지된다.
+            lost_list = []
+            for cell_id, row in list(pivot_map.items()):
+                row = row.substitute(found)
+                if cell_id in found:
+                    del pivot_map[cell_id]
+                    lost_list.append(row)
+                else:
+                    pivot_map[cell_id] = row
+            for row in lost_list:
+                self._insert(pivot_map, row)
+
+            found = self._propagate(row_list, pivot_map)
+
+        return known
+
+    def _insert(self, pivot_map: Dict[int, LinearRow], row: LinearRow):
+        # pivot 줄에는 다른 pivot cell이 없으므로 한번씩만 빼면 된다.
+        for cell_id in [k for k in row.coef if k in pivot_map]:
+            row = row.eliminate(pivot_map[cell_id], cell_id)
+            self.step_count += 1
+
+        if row.is_empty():
+            return
+
+        pivot = min(row.coef)
+        for cell_id, other in list(pivot_map.items()):
+            if pivot in other.coef:
+                pivot_map[cell_id] = other.eliminate(row, pivot)
+                self.step_count += 1
+        pivot_map[pivot] = row
+
+    def _propagate(self, row_list, pivot_map) -> Dict[int, int]:
+        found = {}
+        for row in row_list:
+            found.update(row.propagate())
+        for row in pivot_map.values():
+            found.update(row.propagate())
+        return found
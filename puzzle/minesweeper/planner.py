@@ -0,0 +1,193 @@
+from dataclasses import dataclass, field
+from typing import List, Set, Tuple
+
+from puzzle.minesweeper.geometry import BoardGeometry
+
+FLAG_AUTO = 'auto'
+FLAG_ALWAYS = 'always'
+
+
+@dataclass
+class MovePlan:
+    """
+    zero_list, flag_list, chord_list, open_list 순서로 둔다.
+
+    zero_list : 주변에 지뢰가 없는 것이 확실한 곳. 열면 주변이 같이 열린다.
+    flag_list : 꽂을 깃발. chord에 필요한 깃발이 들어있다.
+    chord_list : (숫자 cell, 그 chord로 열릴 곳 목록)
+    open_list : 나머지 안전한 곳. 0일 것 같은 곳부터
+    """
+    zero_list: List[Tuple[int, int]] = field(default_factory=list)
+    flag_list: List[Tuple[int, int]] = field(default_factory=list)
+    chord_list: List[Tuple[Tuple[int, int], List[Tuple[int, int]]]] = \
+        field(default_factory=list)
+    open_list: List[Tuple[int, int]] = field(default_factory=list)
+
+    @property
+    def action_count(self):
+        return (
+            len(self.zero_list) + len(self.flag_list) +
+            len(self.chord_list) + len(self.open_list)
+        )
+
+
+class MovePlanner:
+    """
+    확실한 곳들을 클릭 수가 적게 두는 순서를 정한다.
+
+    - 0이 확실한 곳을 먼저 열고, 그 연쇄로 열릴 곳은 따로 누르지 않는다.
+    - 숫자만큼 지뢰가 다 밝혀진 숫자 cell은 chord 한번으로 주변을 연다.
+      깃발을 꽂는 수까지 세어서 따로 누르는 것보다 적을 때만 쓴다.
+    - flag가 'auto'면 이기는 데 깃발이 필요 없는 게임에서는
+      chord에 필요한 깃발만 꽂는다.
+      그래서 둘 곳이 없는 plan이 나올 수 있다.
+    """
+
+    def __init__(self, flag=FLAG_AUTO, chord=True):
+        if flag not in (FLAG_AUTO, FLAG_ALWAYS):
+            raise ValueError(f'Unknown flag option : {flag}')
+        self.flag = flag
+        self.chord = chord
+
+    def plan(self, mine_info, index: BoardGeometry,
+             safe_mask, mine_mask, flag_to_win=True,
+             known_mine_mask=0) -> MovePlan:
+        """
+        :param mine_info: 현재 board
+        :param safe_mask: 안전한 것이 확실한 곳
+        :param mine_mask: 지뢰인 것이 확실한 곳
+        :param flag_to_win: 지뢰에 깃발을 모두 꽂아야 게임이 끝나는지
+        :param known_mine_mask: 전에 밝혀졌지만 깃발을 꽂지 않은 지뢰.
+            chord와 순서를 정할 때만 쓰고, chord에 필요할 때만 깃발을 꽂는다.
+        """
+        width = index.width
+        safe_set = set(index.iter_id(safe_mask))
+        mine_set = set(index.iter_id(mine_mask))
+        known_set = set(index.iter_id(known_mine_mask))
+
+        def is_flag(cell_id):
+            return mine_info[cell_id // width][cell_id % width] == '>'
+
+        def is_mine(cell_id):
+            return (
+                cell_id in mine_set or cell_id in known_set or
+                is_flag(cell_id)
+            )
+
+        def is_known_safe(cell_id):
+            if cell_id in safe_set:
+                return True
+            return mine_info[cell_id // width][cell_id % width] not in '->'
+
+        zero_set = {
+            cell_id
+            for cell_id in safe_set
+            if all(is_known_safe(adj) for adj in index.adj_id(cell_id))
+        }
+
+        result = MovePlan()
+        covered: Set[int] = set()
+
+        def cover(cell_id):
+            # 0인 곳이 열리면 주변도 같이 열린다.
+            stack = [cell_id]
+            while stack:
+                cell_id = stack.pop()
+                if cell_id in covered:
+                    continue
+                covered.add(cell_id)
+                if cell_id in zero_set:
+                    stack.extend(index.adj_id(cell_id))
+
+        for cell_id in sorted(zero_set):
+            if cell_id not in covered:
+                result.zero_list.append(index.to_pos(cell_id))
+                cover(cell_id)
+
+        if self.flag == FLAG_ALWAYS or flag_to_win:
+            planned_flag = set(mine_set)
+        else:
+            planned_flag = set()
+
+        if self.chord:
+            self._plan_chord(
+                mine_info, index, safe_set, is_flag, is_mine,
+                planned_flag, covered, cover, result
+            )
+
+        result.flag_list = [
+            index.to_pos(cell_id) for cell_id in sorted(planned_flag)
+        ]
+
+        def zero_order(cell_id):
+            # 지뢰가 확실히 옆에 있으면 0일 수 없으므로 뒤로 보낸다.
+            unknown = 0
+            for adj in index.adj_id(cell_id):
+                if is_mine(adj):
+                    return 1, 0, cell_id
+                if not is_known_safe(adj):
+                    unknown += 1
+            return 0, unknown, cell_id
+
+        result.open_list = [
+            index.to_pos(cell_id)
+            for cell_id in sorted(safe_set - covered, key=zero_order)
+        ]
+        return result
+
+    def _plan_chord(self, mine_info, index, safe_set, is_flag, is_mine,
+                    planned_flag, covered, cover, result):
+        # chord 할 숫자 cell은 안전한 곳 바로 옆에만 있다.
+        near_set = set()
+        for cell_id in safe_set:
+            near_set.update(index.adj_id(cell_id))
+
+        width = index.width
+        candidate_list = []
+        for cell_id in sorted(near_set):
+            v = mine_info[cell_id // width][cell_id % width]
+            if not v.isdigit() or v == '0':
+                continue
+
+            adj_list = index.adj_id(cell_id)
+            mine_list = [adj for adj in adj_list if is_mine(adj)]
+            if len(mine_list) != int(v):
+                continue
+
+            # 주변의 닫힌 곳이 모두 안전하다고 밝혀져 있어야 한다.
+            open_list = [
+                adj for adj in adj_list
+                if mine_info[adj // width][adj % width] == '-' and
+                not is_mine(adj)
+            ]
+            if open_list and all(adj in safe_set for adj in open_list):
+                candidate_list.append((cell_id, mine_list, open_list))
+
+        while candidate_list:
+            best = None
+            best_gain = 0
+            for candidate in candidate_list:
+                _, mine_list, open_list = candidate
+                cost = 1 + sum(
+                    1 for adj in mine_list
+                    if not is_flag(adj) and adj not in planned_flag
+                )
+                gain = sum(1 for adj in open_list if adj not in covered)
+                if gain - cost > best_gain:
+                    best = candidate
+                    best_gain = gain - cost
+
+            if best is None:
+                break
+
+            candidate_list.remove(best)
+            cell_id, mine_list, open_list = best
+            planned_flag.update(
+                adj for adj in mine_list if not is_flag(adj)
+            )
+            result.chord_list.append((
+                index.to_pos(cell_id),
+                [index.to_pos(adj) for adj in open_list]
+            ))
+            for adj in open_list:
+                cover(adj)
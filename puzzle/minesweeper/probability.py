@@ -0,0 +1,354 @@
+import functools
+import math
+import operator
+import time
+from dataclasses import dataclass, field
+from math import comb
+from typing import Dict, List, Optional
+
+from puzzle.minesweeper.component_cache import (ComponentCache,
+                                                component_signature)
+from puzzle.minesweeper.constraint import BitRelation, iter_bit
+
+
+# 재귀로 세기 때문에 이보다 cell이 많은 component는 세지 않는다.
+MAX_COMPONENT_SIZE = 500
+
+
+class BudgetExceeded(Exception):
+    pass
+
+
+@dataclass
+class ComponentSolution:
+    """
+    서로 연결된 관계들(component)을 만족하는 지뢰 배치를 모두 센 결과.
+
+    cell_list : component의 cell id 목록
+    count_map : 지뢰 갯수 k -> 배치 수
+    cell_count_map : 지뢰 갯수 k -> cell_list 순서대로 각 cell이 지뢰인 배치 수
+    """
+    cell_list: List[int]
+    count_map: Dict[int, int] = field(default_factory=dict)
+    cell_count_map: Dict[int, List[int]] = field(default_factory=dict)
+
+
+@dataclass
+class ProbabilityResult:
+    """
+    cell_probability : frontier cell id -> 지뢰일 확률
+    interior_mask : 어떤 관계에도 속하지 않은 확인하지 않은 cell들
+    interior_probability : interior cell 하나가 지뢰일 확률
+    is_exact : 모든 component를 budget 안에 다 센 경우 True
+    """
+    cell_probability: Dict[int, float]
+    interior_mask: int
+    interior_probability: float
+    is_exact: bool
+
+    def get_safest(self, rng) -> Optional[int]:
+        best_id = None
+        best = 2.0
+        for cell_id, probability in self.cell_probability.items():
+            if probability < best:
+                best_id, best = cell_id, probability
+
+        if self.interior_mask and self.interior_probability < best:
+            interior = list(iter_bit(self.interior_mask))
+            return rng.choice(interior)
+
+        return best_id
+
+    def get_safe_list(self) -> List[int]:
+        """
+        :return: 지뢰일 확률이 0인 cell id 목록
+        """
+        safe_list = [
+            cell_id
+            for cell_id, probability in self.cell_probability.items()
+            if probability == 0
+        ]
+        if self.interior_probability == 0:
+            safe_list.extend(iter_bit(self.interior_mask))
+        return safe_list
+
+
+def split_component(relation_list: List[BitRelation]):
+    """
+    cell을 공유하는 관계끼리 묶는다.
+    """
+    component_list: List[List[BitRelation]] = []
+    mask_list: List[int] = []
+
+    for relation in relation_list:
+        merged = [relation]
+        merged_mask = relation.mask
+        rest_component = []
+        rest_mask = []
+
+        for component, mask in zip(component_list, mask_list):
+            if mask & merged_mask:
+                merged.extend(component)
+                merged_mask |= mask
+            else:
+                rest_component.append(component)
+                rest_mask.append(mask)
+
+        component_list = rest_component + [merged]
+        mask_list = rest_mask + [merged_mask]
+
+    return component_list
+
+
+def enumerate_component(relation_list: List[BitRelation],
+                        mine_left, budget) -> ComponentSolution:
+    """
+    backtracking으로 component의 모든 지뢰 배치를 센다.
+    :param budget: [남은 node 수, 끝나야 하는 시각] 을 담은 list. 넘으면 BudgetExceeded
+    """
+    # 관계를 따라가는 순서로 cell을 정해야 가지치기가 빨리 된다.
+    cell_list = []
+    seen = 0
+    for relation in relation_list:
+        for cell_id in iter_bit(relation.mask & ~seen):
+            cell_list.append(cell_id)
+        seen |= relation.mask
+
+    if len(cell_list) > MAX_COMPONENT_SIZE:
+        raise BudgetExceeded
+
+    position = {cell_id: i for i, cell_id in enumerate(cell_list)}
+    cell_relation = [[] for _ in cell_list]
+    need = []
+    remain = []
+    for r, relation in enumerate(relation_list):
+        need.append(relation.count)
+        remain.append(relation.size())
+        for cell_id in iter_bit(relation.mask):
+            cell_relation[position[cell_id]].append(r)
+
+    solution = ComponentSolution(cell_list=cell_list)
+    assigned = [0] * len(cell_list)
+    size = len(cell_list)
+
+    def record(mine):
+        solution.count_map[mine] = solution.count_map.get(mine, 0) + 1
+        cell_count = solution.cell_count_map.get(mine)
+        if cell_count is None:
+            cell_count = solution.cell_count_map[mine] = [0] * size
+        for i in range(size):
+            if assigned[i]:
+                cell_count[i] += 1
+
+    def search(i, mine):
+        budget[0] -= 1
+        if budget[0] < 0 or (budget[0] & 1023 == 0 and
+                             time.perf_counter() > budget[1]):
+            raise BudgetExceeded
+
+        if i == size:
+            record(mine)
+            return
+
+        relation_index = cell_relation[i]
+
+        # 지뢰가 아닌 경우
+        for r in relation_index:
+            remain[r] -= 1
+        if all(need[r] <= remain[r] for r in relation_index):
+            search(i + 1, mine)
+
+        # 지뢰인 경우
+        if mine < mine_left:
+            for r in relation_index:
+                need[r] -= 1
+            if all(0 <= need[r] for r in relation_index):
+                assigned[i] = 1
+                search(i + 1, mine + 1)
+                assigned[i] = 0
+            for r in relation_index:
+                need[r] += 1
+
+        for r in relation_index:
+            remain[r] += 1
+
+    search(0, 0)
+    return solution
+
+
+def heuristic_probability(relation_list: List[BitRelation]):
+    # 다 세지 못한 component는 cell이 속한 관계 중 가장 위험한 비율로 대신한다.
+    result = {}
+    for relation in relation_list:
+        ratio = relation.count / relation.size()
+        for cell_id in iter_bit(relation.mask):
+            result[cell_id] = max(result.get(cell_id, 0.0), ratio)
+    return result
+
+
+def convolve(left: Dict[int, int], right: Dict[int, int]) -> Dict[int, int]:
+    result = {}
+    for k1, v1 in left.items():
+        for k2, v2 in right.items():
+            result[k1 + k2] = result.get(k1 + k2, 0) + v1 * v2
+    return result
+
+
+class ProbabilityEngine:
+    """
+    frontier를 독립적인 component로 나누어 각각의 지뢰 배치를 모두 세고,
+    남은 지뢰 수와 interior cell 수로 조합의 가중치를 주어 정확한 확률을 구한다.
+
+    node_budget, time_budget(초)을 넘으면 그 component는 근사값으로 대신한다.
+    time_budget은 실행할 때마다 결과가 달라질 수 있으므로 기본으로는 쓰지 않는다.
+    cache가 있으면 같은 모양의 component는 다시 세지 않는다.
+    """
+
+    def __init__(self, node_budget=200_000, time_budget=None,
+                 cache: Optional[ComponentCache] = None):
+        self.node_budget = node_budget
+        self.time_budget = time_budget
+        self.cache = cache
+
+    def solve(self, relation_list: List[BitRelation],
+              unknown_mask, mine_left, index=None) -> ProbabilityResult:
+        """
+        :param index: CellIndex. 주면 cache key를 만들 때 대칭을 고려한다.
+        """
+        relation_list = [
+            relation for relation in relation_list
+            if not relation.is_empty()
+        ]
+        budget = [
+            self.node_budget,
+            math.inf if self.time_budget is None
+            else time.perf_counter() + self.time_budget
+        ]
+
+        solution_list: List[ComponentSolution] = []
+        approximate = {}
+        frontier_mask = 0
+
+        # 작은 component부터 세어서 budget이 큰 component 하나에 다 쓰이지 않게 한다.
+        component_list = [
+            (functools.reduce(operator.or_, (r.mask for r in component)),
+             component)
+            for component in split_component(relation_list)
+        ]
+        component_list.sort(key=lambda item: item[0].bit_count())
+
+        for mask, component in component_list:
+            frontier_mask |= mask
+            try:
+                solution = self._solve_component(
+                    component, mine_left, budget, index
+                )
+            except BudgetExceeded:
+                approximate.update(heuristic_probability(component))
+                continue
+            solution_list.append(solution)
+
+        interior_mask = unknown_mask & ~frontier_mask
+        interior = interior_mask.bit_count()
+        # 근사한 component의 cell은 가중치 계산에서 빠진다.
+        mine_left -= round(sum(approximate.values()))
+
+        cell_probability, interior_probability = self._combine(
+            solution_list, interior, mine_left
+        )
+        cell_probability.update(approximate)
+
+        return ProbabilityResult(
+            cell_probability=cell_probability,
+            interior_mask=interior_mask,
+            interior_probability=interior_probability,
+            is_exact=not approximate
+        )
+
+    def _solve_component(self, component, mine_left, budget, index):
+        if self.cache is None:
+            return enumerate_component(component, mine_left, budget)
+
+        key, order = component_signature(component, index)
+        cached = self.cache.get(key)
+        if cached is None:
+            # 남은 지뢰 수와 상관없이 쓸 수 있도록 제한 없이 센다.
+            solution = enumerate_component(component, len(order), budget)
+            position = {
+                cell_id: i
+                for i, cell_id in enumerate(solution.cell_list)
+            }
+            order_position = [position[cell_id] for cell_id in order]
+            cached = ComponentSolution(
+                cell_list=list(range(len(order))),
+                count_map=solution.count_map,
+                cell_count_map={
+                    k: [cell_count[i] for i in order_position]
+                    for k, cell_count in solution.cell_count_map.items()
+                }
+            )
+            self.cache.put(key, cached)
+
+        return ComponentSolution(
+            cell_list=order,
+            count_map=cached.count_map,
+            cell_count_map=cached.cell_count_map
+        )
+
+    def _combine(self, solution_list, interior, mine_left, strict=True):
+        def weight(mine):
+            if not strict:
+                return 1
+            rest = mine_left - mine
+            if rest < 0 or rest > interior:
+                return 0
+            return comb(interior, rest)
+
+        total_map = {0: 1}
+        for solution in solution_list:
+            total_map = convolve(total_map, solution.count_map)
+
+        total = sum(count * weight(k) for k, count in total_map.items())
+        if total == 0:
+            # 남은 지뢰 수와 맞는 배치가 없으면 (깃발이 틀린 경우 등) 전체 수는 무시한다.
+            if strict:
+                return self._combine(
+                    solution_list, interior, mine_left, strict=False
+                )
+            return {}, 1.0
+
+        cell_probability = {}
+        for i, solution in enumerate(solution_list):
+            other_map = {0: 1}
+            for j, other in enumerate(solution_list):
+                if i != j:
+                    other_map = convolve(other_map, other.count_map)
+
+            other_weight = {
+                k: sum(
+                    count * weight(k + other_k)
+                    for other_k, count in other_map.items()
+                )
+                for k in solution.count_map
+            }
+
+            for position, cell_id in enumerate(solution.cell_list):
+                mine_weight = sum(
+                    cell_count[position] * other_weight[k]
+                    for k, cell_count in solution.cell_count_map.items()
+                )
+                cell_probability[cell_id] = mine_weight / total
+
+        if interior and not strict:
+            interior_probability = min(1.0, max(0, mine_left) / interior)
+        elif interior:
+            interior_weight = sum(
+                count * comb(interior - 1, mine_left - k - 1)
+                for k, count in total_map.items()
+                if 0 <= mine_left - k - 1 <= interior - 1
+            )
+            interior_probability = interior_weight / total
+        else:
+            interior_probability = 1.0
+
+        return cell_probability, interior_probability
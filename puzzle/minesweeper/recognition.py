@@ -0,0 +1,184 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+from PIL import Image, ImageChops
+
+
+class RecognitionCache:
+    """
+    cell 그림의 pixel bytes -> 기호.
+
+    같은 칸의 그림이 지난번 화면과 같으면 비교 없이 지난번 기호를 쓰고,
+    다른 칸에서라도 본 적이 있는 그림이면 저장해 둔 기호를 쓴다.
+    get이 None이면 처음 보는 그림이므로 template과 비교해서 put 한다.
+    """
+
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self.symbol_map: Dict[bytes, str] = {}
+        self.last_map: Dict[Tuple[int, int], Tuple[bytes, str]] = {}
+
+        self.skip_count = 0
+        self.hit_count = 0
+        self.miss_count = 0
+
+    def __repr__(self):
+        return (
+            f'RecognitionCache(size={len(self.symbol_map)},'
+            f' skip={self.skip_count}, hit={self.hit_count},'
+            f' miss={self.miss_count})'
+        )
+
+    def get(self, pos, key: bytes) -> Optional[str]:
+        last = self.last_map.get(pos)
+        if last is not None and last[0] == key:
+            self.skip_count += 1
+            return last[1]
+
+        symbol = self.symbol_map.get(key)
+        if symbol is None:
+            self.miss_count += 1
+            return None
+
+        self.hit_count += 1
+        self.last_map[pos] = key, symbol
+        return symbol
+
+    def put(self, pos, key: bytes, symbol):
+        if len(self.symbol_map) >= self.maxsize:
+            self.symbol_map.clear()
+        self.symbol_map[key] = symbol
+        self.last_map[pos] = key, symbol
+
+    def clear(self):
+        self.symbol_map.clear()
+        self.last_map.clear()
+
+
+def average_color(histogram):
+    total = 0
+    color = 0
+    for index, value in enumerate(histogram):
+        total += value
+        color += index * value
+
+    return color / (total * 255)
+
+
+def image_distance(img1, img2):
+    assert img1.size == img2.size
+
+    img_diff = ImageChops.difference(img1, img2)
+    histogram = img_diff.histogram()
+    avg_r = average_color(histogram[:256])
+    avg_g = average_color(histogram[256:512])
+    avg_b = average_color(histogram[512:])
+    return (avg_r + avg_g + avg_b) / 3
+
+
+def load_block_info(path, string_list):
+    """
+    4 x 4 칸으로 나눈 그림에서 string_list 순서대로 template을 읽는다.
+    'x' 자리는 비어 있다.
+    """
+    canvas = Image.open(path)
+    width, height = canvas.size
+    width, height = width // 4, height // 4
+
+    block_info = []
+    for i, t in enumerate(string_list):
+        if t == 'x':
+            continue
+
+        y, x = divmod(i, 4)
+        block_info.append((canvas.crop((
+            width * x, height * y,
+            width * (x + 1), height * (y + 1)
+        )), t))
+
+    return block_info
+
+
+def block_view(board: np.ndarray, size) -> np.ndarray:
+    """
+    (height * size, width * size, 3) 화면 배열을 복사하지 않고
+    (height, width, size, size, 3) 의 cell 배열로 본다.
+    """
+    height = board.shape[0] // size
+    width = board.shape[1] // size
+    s0, s1, s2 = board.strides
+    return as_strided(
+        board,
+        shape=(height, width, size, size, board.shape[2]),
+        strides=(s0 * size, s1 * size, s0, s1, s2),
+        writeable=False
+    )
+
+
+class BoardRecognizer:
+    """
+    board 화면 전체를 한번에 template과 비교한다.
+
+    template은 (template 수, size * size * 3) 으로 쌓아 두고,
+    처음 보는 cell들과의 pixel 차이 절대값의 합을 한번에 구한다.
+    image_distance와 같은 기준이므로 같은 template을 고른다.
+    본 적 있는 cell은 RecognitionCache가 답한다.
+    """
+
+    def __init__(self, block_info, size=25):
+        self.size = size
+        self.symbol_list = [symbol for _, symbol in block_info]
+
+        template = np.stack([
+            np.asarray(image.convert('RGB'), np.int16)
+            for image, _ in block_info
+        ])
+        self.template = template.reshape(len(template), -1)
+        self.cache = RecognitionCache()
+
+    def classify(self, block_list: np.ndarray, chunk=256) -> np.ndarray:
+        """
+        :param block_list: (n, size, size, 3)
+        :param chunk: 한번에 비교할 cell 수. 중간 배열이 너무 커지지 않게 한다.
+        :return: cell 마다 가장 가까운 template 번호
+        """
+        flat = block_list.reshape(len(block_list), -1).astype(np.int16)
+        result = np.empty(len(flat), np.intp)
+        for start in range(0, len(flat), chunk):
+            part = flat[start:start + chunk]
+            distance = np.abs(
+                part[:, None, :] - self.template[None]
+            ).sum(axis=-1, dtype=np.int32)
+            result[start:start + chunk] = distance.argmin(axis=1)
+        return result
+
+    def recognize(self, board: np.ndarray) -> List[List[str]]:
+        """
+        :param board: board 영역만 잘라낸 (height * size, width * size, 3)
+        :return: 줄마다 cell 기호 목록
+        """
+        block = block_view(board, self.size)
+        height, width = block.shape[:2]
+
+        result = [[''] * width for _ in range(height)]
+        miss_list = []
+        for y in range(height):
+            for x in range(width):
+                key = block[y, x].tobytes()
+                symbol = self.cache.get((x, y), key)
+                if symbol is None:
+                    miss_list.append((x, y, key))
+                else:
+                    result[y][x] = symbol
+
+        if miss_list:
+            index_list = self.classify(
+                np.stack([block[y, x] for x, y, _ in miss_list])
+            )
+            for (x, y, key), index in zip(miss_list, index_list.tolist()):
+                symbol = self.symbol_list[index]
+                self.cache.put((x, y), key, symbol)
+                result[y][x] = symbol
+
+        return result
@@ -0,0 +1,249 @@
+import struct
+import time
+from dataclasses import dataclass, field
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+
+from puzzle.minesweeper.board import FIRST_SAFE
+from puzzle.minesweeper.game_memory import MemoryInterface
+from puzzle.minesweeper.geometry import HEX, SQUARE, TORUS
+
+MAGIC = b'MSRC'
+VERSION = 2
+
+GEOMETRY_LIST = [SQUARE, TORUS, HEX]
+
+# width, height, mine_count, geometry, 첫 클릭 x, y, move 수
+RECORD_HEADER = struct.Struct('<HHIBHHI')
+# 생각한 시간(us), 연 cell 수, 깃발 cell 수. 뒤에 cell id가 u32로 이어진다.
+# interior를 한번에 여는 수는 65535 cell을 넘을 수 있어서 갯수도 u32로 적는다.
+MOVE_HEADER = struct.Struct('<III')
+
+
+@dataclass
+class Move:
+    """
+    set_place_batch 한번.
+    elapsed : 이전 수가 끝나고 이 수를 두기까지 걸린 시간 (초)
+    """
+    elapsed: float
+    safe_list: List[Tuple[int, int]] = field(default_factory=list)
+    mine_list: List[Tuple[int, int]] = field(default_factory=list)
+
+
+@dataclass
+class GameRecord:
+    width: int
+    height: int
+    mine_count: int
+    geometry: str
+    mine_list: List[Tuple[int, int]]
+    first_click: Optional[Tuple[int, int]]
+    move_list: List[Move] = field(default_factory=list)
+
+
+def write_header(f: BinaryIO):
+    f.write(MAGIC + bytes([VERSION]))
+
+
+def read_header(f: BinaryIO):
+    header = f.read(len(MAGIC) + 1)
+    if header[:len(MAGIC)] != MAGIC:
+        raise ValueError('Not a minesweeper recording')
+    if header[len(MAGIC)] != VERSION:
+        raise ValueError(f'Unknown recording version : {header[-1]}')
+
+
+def write_record(f: BinaryIO, record: GameRecord):
+    """
+    지뢰 위치는 cell id 순서의 bitmap으로 적는다.
+    """
+    width = record.width
+    first_x, first_y = record.first_click or (0xffff, 0xffff)
+    f.write(RECORD_HEADER.pack(
+        width, record.height, record.mine_count,
+        GEOMETRY_LIST.index(record.geometry),
+        first_x, first_y, len(record.move_list)
+    ))
+
+    bitmap = bytearray((width * record.height + 7) // 8)
+    for x, y in record.mine_list:
+        cell_id = y * width + x
+        bitmap[cell_id >> 3] |= 1 << (cell_id & 7)
+    f.write(bitmap)
+
+    for move in record.move_list:
+        f.write(MOVE_HEADER.pack(
+            min(round(move.elapsed * 1e6), 0xffffffff),
+            len(move.safe_list), len(move.mine_list)
+        ))
+        id_list = [y * width + x for x, y in move.safe_list + move.mine_list]
+        f.write(struct.pack(f'<{len(id_list)}I', *id_list))
+
+
+def read_record(f: BinaryIO) -> Optional[GameRecord]:
+    """
+    :return: 파일 끝이면 None
+    """
+    data = f.read(RECORD_HEADER.size)
+    if not data:
+        return None
+
+    (width, height, mine_count, geometry,
+     first_x, first_y, move_count) = RECORD_HEADER.unpack(data)
+
+    bitmap = f.read((width * height + 7) // 8)
+    mine_list = [
+        (cell_id % width, cell_id // width)
+        for cell_id in range(width * height)
+        if bitmap[cell_id >> 3] >> (cell_id & 7) & 1
+    ]
+
+    move_list = []
+    for _ in range(move_count):
+        elapsed, safe_count, mine_count_ = MOVE_HEADER.unpack(
+            f.read(MOVE_HEADER.size)
+        )
+        size = safe_count + mine_count_
+        pos_list = [
+            (cell_id % width, cell_id // width)
+            for cell_id in struct.unpack(f'<{size}I', f.read(4 * size))
+        ]
+        move_list.append(Move(
+            elapsed=elapsed / 1e6,
+            safe_list=pos_list[:safe_count],
+            mine_list=pos_list[safe_count:]
+        ))
+
+    return GameRecord(
+        width=width,
+        height=height,
+        mine_count=mine_count,
+        geometry=GEOMETRY_LIST[geometry],
+        mine_list=mine_list,
+        first_click=(
+            None if first_x == 0xffff else (first_x, first_y)
+        ),
+        move_list=move_list
+    )
+
+
+def save_record_list(path, record_list: List[GameRecord]):
+    with open(path, 'wb') as f:
+        write_header(f)
+        for record in record_list:
+            write_record(f, record)
+
+
+def iter_record(path) -> Iterator[GameRecord]:
+    with open(path, 'rb') as f:
+        read_header(f)
+        while True:
+            record = read_record(f)
+            if record is None:
+                break
+            yield record
+
+
+class RecordingInterface(MemoryInterface):
+    """
+    MemoryInterface로 게임을 하면서 지뢰 위치와 둔 수를 기록한다.
+    끝난 게임은 record_list에 쌓인다.
+    """
+
+    def __init__(self, width, height, mine_count, seed=None,
+                 geometry=SQUARE, policy=FIRST_SAFE, corpus=None):
+        self.record_list: List[GameRecord] = []
+        self.record: Optional[GameRecord] = None
+        self.last_time = time.perf_counter()
+        super().__init__(
+            width, height, mine_count, seed, geometry,
+            policy=policy, corpus=corpus
+        )
+
+    def reset(self):
+        super().reset()
+        self.record = GameRecord(
+            width=self.width,
+            height=self.height,
+            mine_count=self.mine_count,
+            geometry=self.geometry.kind,
+            mine_list=[],
+            first_click=None
+        )
+        self.last_time = time.perf_counter()
+
+    def set_safe_place(self, x, y):
+        self.set_place_batch([(x, y)], [])
+
+    def set_mine_place(self, x, y):
+        self.set_place_batch([], [(x, y)])
+
+    def set_place_batch(self, safe_list, mine_list):
+        if self.is_game_over:
+            return
+
+        record = self.record
+        record.move_list.append(Move(
+            elapsed=time.perf_counter() - self.last_time,
+            safe_list=list(safe_list),
+            mine_list=list(mine_list)
+        ))
+        if record.first_click is None and safe_list:
+            record.first_click = tuple(safe_list[0])
+
+        super().set_place_batch(safe_list, mine_list)
+
+        if self.is_game_over:
+            record.mine_list = sorted(self.mine_position)
+            self.record_list.append(record)
+        self.last_time = time.perf_counter()
+
+
+class ReplayInterface(MemoryInterface):
+    """
+    기록한 게임을 다시 진행한다.
+
+    solver가 두려는 수는 받기만 하고 실제로는 기록한 수를 두므로,
+    어떤 solver든 기록할 때와 똑같은 board 상태를 차례로 보게 된다.
+    latency_list : solver가 수마다 생각한 시간 (초)
+    """
+
+    def __init__(self, record: GameRecord):
+        self.record = record
+        self.move_index = 0
+        self.latency_list: List[float] = []
+        self.last_time = time.perf_counter()
+        super().__init__(
+            record.width, record.height, record.mine_count,
+            geometry=record.geometry
+        )
+
+    def reset(self):
+        super().reset()
+        self.move_index = 0
+        self.last_time = time.perf_counter()
+
+    def _init_mine_position(self, x, y):
+        self._set_mine_position(self.record.mine_list)
+
+    def set_safe_place(self, x, y):
+        self.set_place_batch([(x, y)], [])
+
+    def set_mine_place(self, x, y):
+        self.set_place_batch([], [(x, y)])
+
+    def set_place_batch(self, safe_list, mine_list):
+        if self.is_game_over:
+            return
+
+        self.latency_list.append(time.perf_counter() - self.last_time)
+
+        if self.move_index < len(self.record.move_list):
+            move = self.record.move_list[self.move_index]
+            self.move_index += 1
+            super().set_place_batch(move.safe_list, move.mine_list)
+        else:
+            # 기록이 끝났는데 게임이 끝나지 않으면 더 진행하지 않는다.
+            self.is_game_over = True
+
+        self.last_time = time.perf_counter()
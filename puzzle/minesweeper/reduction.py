@@ -0,0 +1,78 @@
+from typing import Dict, List
+
+from puzzle.minesweeper.constraint import BitRelation, iter_bit
+
+
+class RelationReducer:
+    """
+    관계들을 서로 빼가면서 어떤 관계도 다른 관계의 부분집합이 아닌 상태까지 만든다.
+
+    cell id 별로 그 cell을 포함하는 관계를 색인해 두어서
+    cell을 공유하는 관계끼리만 비교한다.
+    처리 순서는 입력 순서를 따르는 worklist라서 결과가 항상 같다.
+    """
+
+    def __init__(self):
+        self.relation_map: Dict[BitRelation, None] = {}
+        self.cell_map: Dict[int, Dict[BitRelation, None]] = {}
+        self.step_count = 0
+
+    @property
+    def relations(self) -> List[BitRelation]:
+        return list(self.relation_map)
+
+    def reduce(self, relation_list) -> List[BitRelation]:
+        pending = list(reversed(relation_list))
+
+        while pending:
+            relation = pending.pop()
+            self.step_count += 1
+
+            if relation.is_empty() or relation in self.relation_map:
+                continue
+
+            subset = self._find_subset(relation)
+            if subset is not None:
+                pending.append(subset.sub_info(relation))
+                continue
+
+            for superset in self._find_superset_list(relation):
+                self._remove(superset)
+                pending.append(relation.sub_info(superset))
+
+            self._add(relation)
+
+        return self.relations
+
+    def _find_subset(self, relation):
+        # 각 관계는 가장 낮은 bit의 cell에서 한번만 확인한다.
+        mask = relation.mask
+        while mask:
+            low = mask & -mask
+            mask ^= low
+            for other in self.cell_map.get(low.bit_length() - 1, ()):
+                if other.mask & -other.mask == low and other.is_subset(relation):
+                    return other
+        return None
+
+    def _find_superset_list(self, relation):
+        # superset은 relation의 모든 cell을 가지고 있으므로 한 cell만 보면 된다.
+        low = relation.mask & -relation.mask
+        return [
+            other
+            for other in self.cell_map.get(low.bit_length() - 1, ())
+            if relation.is_subset(other)
+        ]
+
+    def _add(self, relation):
+        self.relation_map[relation] = None
+        for cell_id in iter_bit(relation.mask):
+            self.cell_map.setdefault(cell_id, {})[relation] = None
+
+    def _remove(self, relation):
+        del self.relation_map[relation]
+        for cell_id in iter_bit(relation.mask):
+            bucket = self.cell_map[cell_id]
+            del bucket[relation]
+            if not bucket:
+                del self.cell_map[cell_id]
@@ -0,0 +1,129 @@
+from typing import List
+
+from puzzle.minesweeper.geometry import SQUARE, BoardGeometry
+
+UNKNOWN = 0
+OPEN = 1
+FLAG = 2
+
+# 한 줄에서 확인하지 않은 칸을 열린 칸으로 바꾸는 table
+_OPEN_TABLE = bytes([OPEN if i == UNKNOWN else i for i in range(256)])
+
+
+class RevealEngine:
+    """
+    칸을 열고, 주변 지뢰가 0인 칸이면 연쇄적으로 여는 engine.
+
+    adj_count : 지뢰를 깔 때 한번만 세어 두는 주변 지뢰 수
+    state : cell id 별 UNKNOWN, OPEN, FLAG
+    expanded : 주변을 이미 연 0 칸 (visited bitmap)
+
+    square board는 한 줄씩 0인 구간을 찾아 위, 아래 줄을 한번에 여는
+    scanline 방식으로, 다른 geometry는 이웃 table을 따라 연다.
+    """
+
+    def __init__(self, geometry: BoardGeometry, mine_id_list):
+        self.geometry = geometry
+        size = geometry.width * geometry.height
+
+        self.adj_count = bytearray(size)
+        offset, neighbor = geometry.offset, geometry.neighbor
+        for mine_id in mine_id_list:
+            for adj_id in neighbor[offset[mine_id]:offset[mine_id + 1]]:
+                self.adj_count[adj_id] += 1
+
+        self.state = bytearray(size)
+        self.expanded = bytearray(size)
+
+    def set_flag(self, cell_id):
+        if self.state[cell_id] == UNKNOWN:
+            self.state[cell_id] = FLAG
+
+    def reveal(self, cell_id) -> List[int]:
+        """
+        지뢰가 아닌 cell_id를 연다.
+        :return: 새로 열린 cell id 목록
+        """
+        if self.state[cell_id] != UNKNOWN:
+            return []
+
+        self.state[cell_id] = OPEN
+        result = [cell_id]
+        if self.adj_count[cell_id] == 0:
+            if self.geometry.kind == SQUARE:
+                self._expand_scanline(cell_id, result)
+            else:
+                self._expand_neighbor(cell_id, result)
+        return result
+
+    def _expand_neighbor(self, start, result):
+        adj_count, state, expanded = self.adj_count, self.state, self.expanded
+        offset, neighbor = self.geometry.offset, self.geometry.neighbor
+
+        stack = [start]
+        while stack:
+            i = stack.pop()
+            if expanded[i]:
+                continue
+            expanded[i] = 1
+
+            for j in neighbor[offset[i]:offset[i + 1]]:
+                if state[j] != UNKNOWN:
+                    continue
+
+                state[j] = OPEN
+                result.append(j)
+                if adj_count[j] == 0:
+                    stack.append(j)
+
+    def _expand_scanline(self, start, result):
+        adj_count, state, expanded = self.adj_count, self.state, self.expanded
+        width, height = self.geometry.width, self.geometry.height
+
+        stack = [start]
+        while stack:
+            i = stack.pop()
+            if expanded[i]:
+                continue
+
+            y, x = divmod(i, width)
+            row = y * width
+
+            # 같은 줄에서 0인 구간을 좌우로 넓힌다.
+            left = x
+            while left > 0 and self._is_zero_span(row + left - 1):
+                left -= 1
+            right = x
+            while right < width - 1 and self._is_zero_span(row + right + 1):
+                right += 1
+
+            expanded[row + left:row + right + 1] = (
+                b'\x01' * (right - left + 1)
+            )
+
+            # 구간과 맞닿은 위, 아래, 같은 줄의 칸을 연다.
+            low = max(left - 1, 0)
+            high = min(right + 1, width - 1) + 1
+            for yy in range(max(y - 1, 0), min(y + 2, height)):
+                begin = yy * width + low
+                end = yy * width + high
+                segment = state[begin:end]
+                k = segment.find(UNKNOWN)
+                if k < 0:
+                    continue
+
+                while k >= 0:
+                    j = begin + k
+                    result.append(j)
+                    if adj_count[j] == 0:
+                        stack.append(j)
+                    k = segment.find(UNKNOWN, k + 1)
+
+                state[begin:end] = segment.translate(_OPEN_TABLE)
+
+    def _is_zero_span(self, i):
+        return (
+            self.adj_count[i] == 0 and
+            not self.expanded[i] and
+            self.state[i] != FLAG
+        )
@@ -0,0 +1,201 @@
+import argparse
+import math
+import os
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import List
+
+from puzzle.minesweeper.solver import MinesweeperSolver
+
+
+@dataclass
+class RunReport:
+    try_count: int = 0
+    succeed_count: int = 0
+    game_time_list: List[float] = field(default_factory=list)
+    cache_hit: int = 0
+    cache_miss: int = 0
+    cache_eviction: int = 0
+
+    def merge(self, other: 'RunReport'):
+        self.try_count += other.try_count
+        self.succeed_count += other.succeed_count
+        self.game_time_list.extend(other.game_time_list)
+        self.cache_hit += other.cache_hit
+        self.cache_miss += other.cache_miss
+        self.cache_eviction += other.cache_eviction
+
+    def win_rate(self):
+        if self.try_count == 0:
+            return 0.0
+        return self.succeed_count / self.try_count
+
+    def win_rate_interval(self, z=1.96):
+        """
+        승률의 Wilson score 신뢰구간 (기본 95%)
+        """
+        n = self.try_count
+        if n == 0:
+            return 0.0, 1.0
+
+        p = self.win_rate()
+        center = (p + z * z / (2 * n)) / (1 + z * z / n)
+        margin = (
+            z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) /
+            (1 + z * z / n)
+        )
+        return center - margin, center + margin
+
+    def print_summary(self, elapsed):
+        low, high = self.win_rate_interval()
+        print(
+            f'Games : {self.succeed_count} / {self.try_count}'
+            f' ({self.win_rate() * 100:.2f}%,'
+            f' 95% CI {low * 100:.2f}% ~ {high * 100:.2f}%)'
+        )
+
+        if self.game_time_list:
+            time_list = sorted(self.game_time_list)
+            size = len(time_list)
+            p50 = time_list[size // 2]
+            p99 = time_list[min(size - 1, size * 99 // 100)]
+            print(
+                f'Game time : mean {statistics.fmean(time_list) * 1000:.3f} ms'
+                f', p50 {p50 * 1000:.3f} ms, p99 {p99 * 1000:.3f} ms'
+            )
+
+        lookup = self.cache_hit + self.cache_miss
+        if lookup:
+            print(
+                f'Component cache : hit {self.cache_hit}'
+                f' ({self.cache_hit * 100 / lookup:.1f}%)'
+                f', miss {self.cache_miss}, eviction {self.cache_eviction}'
+            )
+
+        print(
+            f'Elapsed : {elapsed:.2f} s'
+            f' ({self.try_count / elapsed:.1f} games/s)'
+        )
+
+
+def create_interface(engine, width, height, mine_count, seed,
+                     geometry='square', policy='safe'):
+    if engine == 'numpy':
+        from puzzle.minesweeper.game_numpy import NumpyInterface
+        return NumpyInterface(
+            width, height, mine_count, seed, geometry, policy=policy
+        )
+
+    from puzzle.minesweeper.game_memory import MemoryInterface
+    return MemoryInterface(
+        width, height, mine_count, seed, geometry, policy=policy
+    )
+
+
+def shard_seed(seed, shard):
+    # shard 마다 게임과 solver에 줄 seed를 정해진 방법으로 만든다.
+    rng = random.Random(seed * 1_000_003 + shard)
+    return rng.getrandbits(63), rng.getrandbits(63)
+
+
+def run_shard(engine, width, height, mine_count, seed, shard, count,
+              cache_size=4096, geometry='square', policy='safe'):
+    game_seed, solver_seed = shard_seed(seed, shard)
+    api = create_interface(
+        engine, width, height, mine_count, game_seed, geometry, policy
+    )
+    solver = MinesweeperSolver(
+        api, seed=solver_seed, cache_size=cache_size
+    )
+
+    report = RunReport()
+    for _ in range(count):
+        start = time.perf_counter()
+        solver.solve_game()
+        report.game_time_list.append(time.perf_counter() - start)
+
+    info = api.get_info()
+    report.try_count = info.try_count
+    report.succeed_count = info.succeed_count
+
+    cache = solver.probability_engine.cache
+    if cache is not None:
+        report.cache_hit = cache.hit_count
+        report.cache_miss = cache.miss_count
+        report.cache_eviction = cache.eviction_count
+
+    return report
+
+
+def split_count(count, shard_count):
+    size, rest = divmod(count, shard_count)
+    return [size + (1 if i < rest else 0) for i in range(shard_count)]
+
+
+def run_parallel(width, height, mine_count, count,
+                 jobs=None, seed=0, engine='memory', shard_size=100,
+                 cache_size=4096, geometry='square', policy='safe'):
+    """
+    count 판의 게임을 shard로 나눠서 process pool에서 진행하고 결과를 합친다.
+    같은 seed와 shard_size면 jobs 갯수와 상관없이 같은 게임들을 진행한다.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    shard_count = max(1, math.ceil(count / shard_size))
+
+    report = RunReport()
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        future_list = [
+            executor.submit(
+                run_shard,
+                engine, width, height, mine_count, seed, shard, shard_games,
+                cache_size, geometry, policy
+            )
+            for shard, shard_games in enumerate(
+                split_count(count, shard_count)
+            )
+        ]
+        for future in future_list:
+            report.merge(future.result())
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='puzzle.minesweeper.runner')
+    parser.add_argument('--width', type=int, default=59)
+    parser.add_argument('--height', type=int, default=31)
+    parser.add_argument('--mines', type=int)
+    parser.add_argument('--count', type=int, default=10000)
+    parser.add_argument('--jobs', type=int)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--shard-size', type=int, default=100)
+    parser.add_argument('--cache-size', type=int, default=4096)
+    parser.add_argument(
+        '--engine', choices=['memory', 'numpy'], default='memory'
+    )
+    parser.add_argument(
+        '--geometry', choices=['square', 'torus', 'hex'], default='square'
+    )
+    parser.add_argument(
+        '--first-click', choices=['safe', 'zero'], default='safe'
+    )
+    args = parser.parse_args()
+
+    w, h = args.width, args.height
+    mine_count = args.mines if args.mines is not None else w * h // 6
+
+    start = time.perf_counter()
+    report = run_parallel(
+        w, h, mine_count, args.count,
+        jobs=args.jobs, seed=args.seed, engine=args.engine,
+        shard_size=args.shard_size, cache_size=args.cache_size,
+        geometry=args.geometry, policy=args.first_click
+    )
+    report.print_summary(time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    main()
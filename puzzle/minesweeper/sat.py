@@ -0,0 +1,417 @@
+from itertools import combinations
+from typing import Dict, List, Optional, Tuple
+
+from puzzle.minesweeper.component_cache import ComponentCache
+from puzzle.minesweeper.constraint import BitRelation, iter_bit
+from puzzle.minesweeper.probability import split_component
+
+
+class SatSolver:
+    """
+    표준 라이브러리만 쓰는 작은 CDCL SAT solver.
+
+    literal은 DIMACS처럼 변수 번호(1부터)에 부호를 붙인 int 이다.
+    - 절마다 두 literal을 감시하면서 unit propagation을 한다.
+    - 충돌하면 1UIP 절을 배우고 필요한 level까지 되돌아간다.
+    - solve(assumptions)를 여러번 불러도 배운 절을 계속 쓴다.
+    """
+
+    def __init__(self):
+        self.ok = True
+        self.clause_list: List[List[int]] = []
+        self.watch: Dict[int, List[int]] = {}
+
+        # 변수 번호로 찾는 값. 0번은 쓰지 않는다.
+        self.value = [0]
+        self.level = [0]
+        self.reason: List[Optional[int]] = [None]
+        self.activity = [0.0]
+        self.phase = [False]
+        self.activity_inc = 1.0
+
+        self.trail: List[int] = []
+        self.trail_lim: List[int] = []
+        self.queue_head = 0
+        self.model: List[int] = []
+
+        self.conflict_count = 0
+        self.learned_count = 0
+
+    def close(self):
+        pass
+
+    def add_clause(self, clause):
+        self._backtrack(0)
+        if not self.ok:
+            return
+
+        lit_list = []
+        for lit in dict.fromkeys(clause):
+            self._reserve(abs(lit))
+            if -lit in lit_list:
+                return
+            value = self._lit_value(lit)
+            if value is True:
+                return
+            if value is None:
+                lit_list.append(lit)
+
+        if not lit_list:
+            self.ok = False
+        elif len(lit_list) == 1:
+            self._enqueue(lit_list[0], None)
+            if self._propagate() is not None:
+                self.ok = False
+        else:
+            self._attach(lit_list)
+
+    def solve(self, assumptions=()) -> bool:
+        assumptions = list(assumptions)
+        for lit in assumptions:
+            self._reserve(abs(lit))
+
+        if not self.ok:
+            return False
+
+        while True:
+            conflict = self._propagate()
+            if conflict is not None:
+                self.conflict_count += 1
+                if not self.trail_lim:
+                    self.ok = False
+                    return False
+
+                learned, back_level = self._analyze(conflict)
+                self._backtrack(back_level)
+                if len(learned) == 1:
+                    self._enqueue(learned[0], None)
+                else:
+                    self.learned_count += 1
+                    self._enqueue(learned[0], self._attach(learned))
+                self.activity_inc /= 0.95
+                continue
+
+            level = len(self.trail_lim)
+            if level < len(assumptions):
+                lit = assumptions[level]
+                value = self._lit_value(lit)
+                if value is False:
+                    self._backtrack(0)
+                    return False
+
+                self.trail_lim.append(len(self.trail))
+                if value is None:
+                    self._enqueue(lit, None)
+                continue
+
+            var = self._pick_var()
+            if var is None:
+                self.model = [
+                    var if self.value[var] > 0 else -var
+                    for var in range(1, len(self.value))
+                ]
+                self._backtrack(0)
+                return True
+
+            self.trail_lim.append(len(self.trail))
+            self._enqueue(var if self.phase[var] else -var, None)
+
+    def get_model(self) -> List[int]:
+        return self.model
+
+    def _reserve(self, var):
+        while len(self.value) <= var:
+            self.value.append(0)
+            self.level.append(0)
+            self.reason.append(None)
+            self.activity.append(0.0)
+            self.phase.append(False)
+
+    def _lit_value(self, lit):
+        value = self.value[abs(lit)]
+        if value == 0:
+            return None
+        return (value > 0) == (lit > 0)
+
+    def _attach(self, lit_list):
+        index = len(self.clause_list)
+        self.clause_list.append(lit_list)
+        self.watch.setdefault(lit_list[0], []).append(index)
+        self.watch.setdefault(lit_list[1], []).append(index)
+        return index
+
+    def _enqueue(self, lit, reason):
+        var = abs(lit)
+        self.value[var] = 1 if lit > 0 else -1
+        self.level[var] = len(self.trail_lim)
+        self.reason[var] = reason
+        self.trail.append(lit)
+
+    def _propagate(self) -> Optional[int]:
+        """
+        :return: 충돌한 절 번호. 충돌이 없으면 None
+        """
+        while self.queue_head < len(self.trail):
+            false_lit = -self.trail[self.queue_head]
+            self.queue_head += 1
+
+            watch_list = self.watch.get(false_lit)
+            if not watch_list:
+                continue
+
+            keep = []
+            for i, index in enumerate(watch_list):
+                clause = self.clause_list[index]
+                if clause[0] == false_lit:
+                    clause[0], clause[1] = clause[1], clause[0]
+
+                if self._lit_value(clause[0]) is True:
+                    keep.append(index)
+                    continue
+
+                for k in range(2, len(clause)):
+                    if self._lit_value(clause[k]) is not False:
+                        clause[1], clause[k] = clause[k], clause[1]
+                        self.watch.setdefault(clause[1], []).append(index)
+                        break
+                else:
+                    keep.append(index)
+                    if self._lit_value(clause[0]) is False:
+                        keep.extend(watch_list[i + 1:])
+                        self.watch[false_lit] = keep
+                        return index
+                    self._enqueue(clause[0], index)
+
+            self.watch[false_lit] = keep
+
+        return None
+
+    def _analyze(self, conflict) -> Tuple[List[int], int]:
+        level = len(self.trail_lim)
+        seen = set()
+        learned = [0]
+        counter = 0
+        lit = None
+        i = len(self.trail) - 1
+        clause = self.clause_list[conflict]
+
+        while True:
+            for other in clause:
+                var = abs(other)
+                if lit is not None and var == abs(lit):
+                    continue
+                if var in seen or self.level[var] == 0:
+                    continue
+
+                seen.add(var)
+                self._bump(var)
+                if self.level[var] == level:
+                    counter += 1
+                else:
+                    learned.append(other)
+
+            while abs(self.trail[i]) not in seen:
+                i -= 1
+            lit = self.trail[i]
+            i -= 1
+            seen.discard(abs(lit))
+            counter -= 1
+            if counter == 0:
+                break
+            clause = self.clause_list[self.reason[abs(lit)]]
+
+        learned[0] = -lit
+        if len(learned) == 1:
+            return learned, 0
+
+        # 두번째로 높은 level의 literal을 감시할 수 있도록 앞으로 옮긴다.
+        best = max(range(1, len(learned)),
+                   key=lambda k: self.level[abs(learned[k])])
+        learned[1], learned[best] = learned[best], learned[1]
+        return learned, self.level[abs(learned[1])]
+
+    def _bump(self, var):
+        self.activity[var] += self.activity_inc
+        if self.activity[var] > 1e100:
+            self.activity = [a * 1e-100 for a in self.activity]
+            self.activity_inc *= 1e-100
+
+    def _backtrack(self, level):
+        if len(self.trail_lim) <= level:
+            return
+
+        limit = self.trail_lim[level]
+        for lit in self.trail[limit:]:
+            var = abs(lit)
+            self.phase[var] = lit > 0
+            self.value[var] = 0
+            self.reason[var] = None
+        del self.trail[limit:]
+        del self.trail_lim[level:]
+        self.queue_head = min(self.queue_head, limit)
+
+    def _pick_var(self) -> Optional[int]:
+        best = None
+        best_activity = -1.0
+        for var in range(1, len(self.value)):
+            if self.value[var] == 0 and self.activity[var] > best_activity:
+                best, best_activity = var, self.activity[var]
+        return best
+
+
+class PysatSolver:
+    """
+    pysat이 설치되어 있으면 같은 interface로 쓴다.
+    """
+
+    def __init__(self, name='minisat22'):
+        from pysat.solvers import Solver
+        self.solver = Solver(name=name)
+
+    def close(self):
+        self.solver.delete()
+
+    def add_clause(self, clause):
+        self.solver.add_clause(list(clause))
+
+    def solve(self, assumptions=()) -> bool:
+        return self.solver.solve(assumptions=list(assumptions))
+
+    def get_model(self) -> List[int]:
+        return self.solver.get_model()
+
+
+def get_sat_factory(backend='auto'):
+    """
+    :param backend: 'builtin', 'pysat', 'auto' (pysat이 있으면 pysat)
+    :return: 인자 없이 부르면 solver를 만드는 class
+    """
+    if backend == 'builtin':
+        return SatSolver
+    if backend == 'pysat':
+        return PysatSolver
+    if backend != 'auto':
+        raise ValueError(f'Unknown SAT backend : {backend}')
+
+    try:
+        import pysat.solvers
+    except ImportError:
+        return SatSolver
+    return PysatSolver
+
+
+def create_sat_solver(backend='auto'):
+    return get_sat_factory(backend)()
+
+
+def exactly_clause_list(var_list, count):
+    """
+    var_list 중 정확히 count개가 참인 것을 절로 바꾼다.
+    관계는 이웃 cell 수(최대 8개)를 넘지 않으므로 조합으로 바로 적는다.
+    """
+    size = len(var_list)
+    if count < 0 or count > size:
+        return [[]]
+
+    clause_list = [
+        [-var for var in group]
+        for group in combinations(var_list, count + 1)
+    ]
+    clause_list.extend(
+        list(group)
+        for group in combinations(var_list, size - count + 1)
+    )
+    return clause_list
+
+
+class SatDeducer:
+    """
+    component마다 관계를 SAT 절로 바꾸고,
+    cell 하나씩 반대 값을 가정(assumption)해서 풀어본다.
+    풀리지 않으면 그 cell의 값은 확실하다.
+    풀리면 그 해에서 값이 달라진 cell들은 더 확인하지 않는다.
+
+    같은 component는 다음 수에서도 다시 풀지 않도록 cache에 둔다.
+    """
+
+    def __init__(self, backend='auto', cache_size=4096):
+        self.backend = backend
+        # 'auto'일 때 pysat import를 component마다 다시 해보지 않는다.
+        self.solver_factory = get_sat_factory(backend)
+        self.cache = ComponentCache(cache_size)
+        self.solve_count = 0
+
+    def deduce(self, relation_list: List[BitRelation]) -> Tuple[int, int]:
+        """
+        :return: (안전한 cell mask, 지뢰 cell mask)
+        """
+        relation_list = [
+            relation for relation in relation_list
+            if not relation.is_empty()
+        ]
+
+        safe_mask = 0
+        mine_mask = 0
+        for component in split_component(relation_list):
+            key = tuple(sorted(
+                (relation.mask, relation.count) for relation in component
+            ))
+            result = self.cache.get(key)
+            if result is None:
+                result = self._deduce_component(component)
+                self.cache.put(key, result)
+
+            safe_mask |= result[0]
+            mine_mask |= result[1]
+
+        return safe_mask, mine_mask
+
+    def _deduce_component(self, component) -> Tuple[int, int]:
+        mask = 0
+        for relation in component:
+            mask |= relation.mask
+        cell_list = list(iter_bit(mask))
+        var_map = {cell_id: i + 1 for i, cell_id in enumerate(cell_list)}
+
+        solver = self.solver_factory()
+        try:
+            for relation in component:
+                for clause in exactly_clause_list(
+                    [var_map[cell_id] for cell_id in iter_bit(relation.mask)],
+                    relation.count
+                ):
+                    solver.add_clause(clause)
+
+            self.solve_count += 1
+            if not solver.solve():
+                # 깃발이 틀린 경우 등 만족하는 배치가 없다.
+                return 0, 0
+
+            candidate = {abs(lit): lit > 0 for lit in solver.get_model()}
+            for cell_id in cell_list:
+                var = var_map[cell_id]
+                if var not in candidate:
+                    continue
+
+                lit = -var if candidate[var] else var
+                self.solve_count += 1
+                if solver.solve([lit]):
+                    for other in solver.get_model():
+                        if candidate.get(abs(other)) is not None and \
+                                candidate[abs(other)] != (other > 0):
+                            del candidate[abs(other)]
+                else:
+                    # 확실한 값은 절로 넣어서 다음 풀이를 줄인다.
+                    solver.add_clause([-lit])
+        finally:
+            solver.close()
+
+        safe_mask = 0
+        mine_mask = 0
+        for cell_id in cell_list:
+            value = candidate.get(var_map[cell_id])
+            if value is True:
+                mine_mask |= 1 << cell_id
+            elif value is False:
+                safe_mask |= 1 << cell_id
+        return safe_mask, mine_mask
@@ -1,125 +1,230 @@
 import random
-from typing import List, Tuple
+from typing import Optional
 
 from puzzle.game import GameInterfaceBase
-
-
-class Relation:
-    def __init__(self, pos_list, count):
-        self.pos_list: List[Tuple[int, int]] = list(pos_list)
-        self.pos_list.sort()
-        self.count = count
-
-    def is_subset(self, other):
-        for i in self.pos_list:
-            if i not in other.pos_list:
-                return False
-        return True
-
-    def sub_info(self, other):
-        return Relation(
-            [
-                pos
-                for pos in other.pos_list
-                if pos not in self.pos_list
-            ],
-            other.count - self.count
-        )
-
-    def is_empty(self):
-        return len(self.pos_list) == 0
-
-    def has_save(self):
-        return len(self.pos_list) > 0 and self.count == 0
-
-    def has_bomb(self):
-        return len(self.pos_list) == self.count
+from puzzle.minesweeper.component_cache import ComponentCache
+from puzzle.minesweeper.constraint import BitRelation
+from puzzle.minesweeper.geometry import BoardGeometry, get_geometry
+from puzzle.minesweeper.linear import LinearReducer
+from puzzle.minesweeper.planner import MovePlan, MovePlanner
+from puzzle.minesweeper.probability import ProbabilityEngine
+from puzzle.minesweeper.reduction import RelationReducer
+from puzzle.minesweeper.sat import SatDeducer
+from puzzle.minesweeper.state import SolverState
 
 
 class MinesweeperSolver:
-    def __init__(self, api):
+    def __init__(self, api, incremental=True, seed=None,
+                 guess='probability', cache_size=4096, deduction='subset',
+                 plan=None):
+        """
+        :param guess: 확실한 곳이 없을 때 고르는 방법.
+            'probability' - 지뢰일 확률이 가장 낮은 곳, 'random' - 아무 곳
+        :param cache_size: 풀어둔 component를 저장할 갯수. 0이면 저장하지 않음
+        :param deduction: 부분집합 관계로 못 찾았을 때 확실한 곳을 찾는 방법.
+            'subset' - 더 찾지 않음, 'linear' - 가우스 소거, 'sat' - SAT 풀이,
+            또는 deduce(relation_list) -> (안전 mask, 지뢰 mask) 가 있는 객체
+        :param plan: 확실한 곳들을 두는 방법. None이면 모두 하나씩 누른다.
+            'auto' - MovePlanner로 클릭 수를 줄인다. 이기는 데 깃발이
+                필요 없는 게임이면 필요한 깃발만 꽂는다.
+            'always' - MovePlanner를 쓰고 깃발은 모두 꽂는다.
+        """
         self.api: GameInterfaceBase = api
+        self.incremental = incremental
+        self.random = random.Random(seed)
+        self.guess = guess
+        if deduction == 'subset':
+            self.deducer = None
+        elif deduction == 'linear':
+            self.deducer = LinearReducer()
+        elif deduction == 'sat':
+            self.deducer = SatDeducer(cache_size=cache_size)
+        else:
+            self.deducer = deduction
+        self.probability_engine = ProbabilityEngine(
+            cache=ComponentCache(cache_size) if cache_size > 0 else None
+        )
+        self.planner = MovePlanner(plan) if plan is not None else None
+        self.state: Optional[SolverState] = None
+
+        # 확실해서 둔 cell 수, 찍은 횟수, 클릭 수
+        self.deduced_count = 0
+        self.guess_count = 0
+        self.action_count = 0
+        # 이번 게임에서 지뢰라고 찾은 곳. 깃발을 꽂지 않은 곳도 들어있다.
+        self.mine_mask = 0
 
     def solve(self, count=1):
         self.api.wait()
 
         for i in range(count):
             print('Game :', i+1)
-            self.api.reset()
-
-            while True:
-                self._solve_one()
-                info = self.api.get_info()
-
-                if info.is_game_over:
-                    break
+            self.solve_game()
 
         self.api.wait()
 
-    def _solve_one(self):
-        info = self.api.get_info()
-
-        relation_list = [
-            self._adj_list(x, y, info, v)
-            for x, y, v in self._number_block_list(info.mine_info)
-        ]
-        normalized: List[Relation] = []
+    def solve_game(self):
+        self.api.reset()
+        self.state = None
+        self.mine_mask = 0
 
-        while relation_list:
-            relation = relation_list.pop()
-            if relation.is_empty():
-                continue
+        while True:
+            self._solve_one()
 
-            queue_size = len(relation_list)
-
-            for norm in normalized:
-                if norm.is_subset(relation):
-                    relation_list.append(norm.sub_info(relation))
-                elif relation.is_subset(norm):
-                    relation_list.append(relation.sub_info(norm))
-                    relation_list.append(relation)
-                    normalized.remove(norm)
-                else:
-                    continue
+            if self._is_game_over():
                 break
 
-            if queue_size < len(relation_list):
-                random.shuffle(relation_list)
-            else:
-                normalized.append(relation)
-
-        clicked = 0
-        bomb_set = set()
+    def _solve_one(self):
+        if self.incremental:
+            state = self._load_state()
+            index = state.index
+            mine_info = state.mine_info
+            mine_count = state.mine_count
+            relation_list = state.relations
+        else:
+            info = self.api.get_info()
+            index = self._get_cell_index(info)
+            mine_info = info.mine_info
+            mine_count = info.mine_count
+            relation_list = [
+                self._adj_list(x, y, info, v, index)
+                for x, y, v in self._number_block_list(info.mine_info)
+            ]
+
+        if self.mine_mask:
+            relation_list = self._remove_mine(relation_list)
+
+        normalized = RelationReducer().reduce(relation_list)
+
+        safe_mask = 0
+        bomb_mask = 0
 
         for relation in normalized:
             if relation.has_save():
-                for x, y in relation.pos_list:
-                    self.api.set_safe_place(x, y)
-                    clicked += 1
+                safe_mask |= relation.mask
             elif relation.has_bomb():
-                for x, y in relation.pos_list:
-                    if (x, y) not in bomb_set:
-                        self.api.set_mine_place(x, y)
-                        bomb_set.add((x, y))
-                        clicked += 1
-
-        if clicked == 0:
-            x, y = self._get_random_pos(info, bomb_set)
-            self.api.set_safe_place(x, y)
-
-    def _get_random_pos(self, info, bomb_set):
+                bomb_mask |= relation.mask
+
+        if not (safe_mask or bomb_mask) and self.deducer is not None:
+            safe_mask, bomb_mask = self.deducer.deduce(normalized)
+
+        if safe_mask or bomb_mask:
+            self.deduced_count += (safe_mask | bomb_mask).bit_count()
+            self.mine_mask |= bomb_mask
+            self._place(mine_info, index, safe_mask, bomb_mask)
+        else:
+            self.guess_count += 1
+            guess_list = self._get_guess_list(
+                mine_info, index, normalized, mine_count
+            )
+            if len(guess_list) > 1:
+                # 확률로 확실한 곳들이므로 같이 계획한다.
+                self._place(mine_info, index, index.to_mask(guess_list), 0)
+            else:
+                self.action_count += 1
+                self.api.set_place_batch(guess_list, [])
+
+    def _remove_mine(self, relation_list):
+        # 깃발을 꽂지 않은 지뢰도 깃발처럼 관계에서 뺀다.
+        mine_mask = self.mine_mask
+        result = []
+        for relation in relation_list:
+            common = relation.mask & mine_mask
+            if common:
+                relation = BitRelation(
+                    relation.mask & ~common,
+                    relation.count - common.bit_count()
+                )
+            result.append(relation)
+        return result
+
+    def _place(self, mine_info, index, safe_mask, bomb_mask):
+        if self.planner is None:
+            safe_list = list(index.iter_pos(safe_mask))
+            mine_list = list(index.iter_pos(bomb_mask))
+            self.action_count += len(safe_list) + len(mine_list)
+            self.api.set_place_batch(safe_list, mine_list)
+            return
+
+        # 전의 수에서 밝혀졌지만 아직 닫혀 있는 지뢰도 chord에 쓸 수 있다.
+        known_mine_mask = 0
+        for cell_id in index.iter_id(self.mine_mask & ~bomb_mask):
+            x, y = index.to_pos(cell_id)
+            if mine_info[y][x] == '-':
+                known_mine_mask |= 1 << cell_id
+
+        plan: MovePlan = self.planner.plan(
+            mine_info, index, safe_mask, bomb_mask, self.api.flag_to_win,
+            known_mine_mask
+        )
+        self.action_count += plan.action_count
+
+        if plan.zero_list or plan.flag_list:
+            self.api.set_place_batch(plan.zero_list, plan.flag_list)
+        for (x, y), open_list in plan.chord_list:
+            self.api.set_chord_place(x, y, open_list)
+        if plan.open_list:
+            self.api.set_place_batch(plan.open_list, [])
+
+    def _is_game_over(self):
+        if self.incremental:
+            return self._load_state().is_game_over
+        return self.api.get_info().is_game_over
+
+    def _load_state(self):
+        if self.state is None:
+            info = self.api.get_info()
+            self.state = SolverState(self._get_cell_index(info))
+            self.state.update(info)
+        else:
+            self.state.apply_changes(
+                self.api.get_changes(self.state.revision)
+            )
+        return self.state
+
+    def _get_guess_list(self, mine_info, index, normalized, mine_count):
+        """
+        :return: 확률로 확실히 안전한 곳들, 없으면 가장 안전한 한 곳
+        """
+        if self.guess == 'probability':
+            unknown_mask = 0
+            flag_count = 0
+            for y, row in enumerate(mine_info):
+                for x, v in enumerate(row):
+                    if v == '-':
+                        unknown_mask |= 1 << index.to_id(x, y)
+                    elif v == '>':
+                        flag_count += 1
+
+            # 깃발을 꽂지 않은 지뢰는 깃발을 꽂은 것처럼 센다.
+            flag_count += (unknown_mask & self.mine_mask).bit_count()
+            unknown_mask &= ~self.mine_mask
+
+            result = self.probability_engine.solve(
+                normalized, unknown_mask, mine_count - flag_count, index
+            )
+            safe_list = result.get_safe_list()
+            if safe_list:
+                return [index.to_pos(cell_id) for cell_id in safe_list]
+
+            cell_id = result.get_safest(self.random)
+            if cell_id is not None:
+                return [index.to_pos(cell_id)]
+
+        return [self._get_random_pos(mine_info, index)]
+
+    def _get_random_pos(self, mine_info, index):
         pos_list = [
             (x, y)
-            for x in range(info.width)
-            for y in range(info.height)
+            for x in range(index.width)
+            for y in range(index.height)
         ]
-        random.shuffle(pos_list)
+        self.random.shuffle(pos_list)
 
         for x, y in pos_list:
-            if (x, y) in bomb_set:
+            if mine_info[y][x] != '-':
                 continue
-
-            if info.mine_info[y][x] != '-':
+            if self.mine_mask >> index.to_id(x, y) & 1:
                 continue
 
             return x, y
@@ -132,20 +237,17 @@ class MinesweeperSolver:
                     if 0 < v:
                         yield x, y, v
 
-    def _adj_list(self, x, y, info, v):
-        pos_list = []
+    def _get_cell_index(self, info) -> BoardGeometry:
+        return get_geometry(info.width, info.height, info.geometry)
 
-        for x1 in range(x-1, x+2):
-            for y1 in range(y-1, y+2):
-                if x1 == x and y1 == y:
-                    continue
+    def _adj_list(self, x, y, info, v, index):
+        mask = 0
 
-                if 0 <= x1 < info.width:
-                    if 0 <= y1 < info.height:
-                        cell = info.mine_info[y1][x1]
-                        if cell == '-':
-                            pos_list.append((x1, y1))
-                        elif cell == '>':
-                            v -= 1
+        for x1, y1 in index.adj_pos(x, y):
+            cell = info.mine_info[y1][x1]
+            if cell == '-':
+                mask |= 1 << index.to_id(x1, y1)
+            elif cell == '>':
+                v -= 1
 
-        return Relation(pos_list, v)
+        return BitRelation(mask, v)
@@ -0,0 +1,102 @@
+from typing import Dict, List
+
+from puzzle.game import GameChangeInfo
+from puzzle.minesweeper.constraint import BitRelation
+from puzzle.minesweeper.geometry import BoardGeometry
+
+
+class SolverState:
+    """
+    move 사이에 관계들을 유지하는 solver 상태.
+    바뀐 cell과 그 주변의 숫자 cell에 대한 관계만 다시 만든다.
+    """
+
+    def __init__(self, index: BoardGeometry):
+        self.index = index
+        self.mine_info: List[List[str]] = [
+            ['-'] * index.width
+            for _ in range(index.height)
+        ]
+        self.is_game_over = False
+        self.mine_count = 0
+        self.revision = 0
+        # 숫자 cell id -> 그 cell이 만드는 관계
+        self.relation_map: Dict[int, BitRelation] = {}
+
+    @property
+    def relations(self) -> List[BitRelation]:
+        return list(self.relation_map.values())
+
+    def update(self, info, changed_list=None) -> List[BitRelation]:
+        """
+        :param info: 현재 GameInfo
+        :param changed_list: 지난 update 이후 열리거나 깃발이 꽂힌 (x, y) 목록.
+            None이면 가지고 있는 mine_info와 비교해서 찾는다.
+        :return: 현재 frontier의 관계 목록
+        """
+        if changed_list is None:
+            changed_list = list(self._diff(info.mine_info))
+
+        self.is_game_over = info.is_game_over
+        self.mine_count = info.mine_count
+        self.revision = info.revision
+        return self._apply([
+            (x, y, info.mine_info[y][x])
+            for x, y in changed_list
+        ])
+
+    def apply_changes(self, changes: GameChangeInfo) -> List[BitRelation]:
+        """
+        GameInterfaceBase.get_changes 의 결과를 반영한다.
+        """
+        self.is_game_over = changes.is_game_over
+        self.revision = changes.revision
+        return self._apply([
+            (x, y, v)
+            for x, y, v in changes.cell_list
+            if self.mine_info[y][x] != v
+        ])
+
+    def _apply(self, cell_list):
+        affected = set()
+        for x, y, v in cell_list:
+            self.mine_info[y][x] = v
+            affected.add((x, y))
+            affected.update(self.index.adj_pos(x, y))
+
+        for x, y in affected:
+            self._update_cell(x, y)
+
+        return self.relations
+
+    def _update_cell(self, x, y):
+        cell_id = self.index.to_id(x, y)
+        v = self.mine_info[y][x]
+
+        relation = None
+        if v.isdigit() and v != '0':
+            relation = self._build_relation(x, y, int(v))
+
+        if relation is None or relation.is_empty():
+            self.relation_map.pop(cell_id, None)
+        else:
+            self.relation_map[cell_id] = relation
+
+    def _build_relation(self, x, y, v):
+        mask = 0
+        for x1, y1 in self.index.adj_pos(x, y):
+            cell = self.mine_info[y1][x1]
+            if cell == '-':
+                mask |= 1 << self.index.to_id(x1, y1)
+            elif cell == '>':
+                v -= 1
+        return BitRelation(mask, v)
+
+    def _diff(self, new_info):
+        for y, (old_row, new_row) in enumerate(zip(self.mine_info, new_info)):
+            if ''.join(old_row) == new_row:
+                continue
+
+            for x, (old, new) in enumerate(zip(old_row, new_row)):
+                if old != new:
+                    yield x, y
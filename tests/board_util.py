@@ -0,0 +1,92 @@
+import random
+from typing import List, Set, Tuple
+
+from puzzle.minesweeper.constraint import BitRelation, iter_bit
+from puzzle.minesweeper.geometry import get_geometry
+
+
+def hidden_board(width, height, mine_count, rng: random.Random,
+                 reveal_ratio, kind='square'):
+    """
+    지뢰 위치를 알고 있는 게임 중간 상태를 만든다.
+    :return: (geometry, 지뢰 cell id 집합, 열린 cell id 집합, frontier 관계 목록)
+    """
+    geometry = get_geometry(width, height, kind)
+    size = width * height
+    mine_set: Set[int] = set(rng.sample(range(size), mine_count))
+    adj_count = [
+        sum(1 for adj in geometry.adj_id(cell_id) if adj in mine_set)
+        for cell_id in range(size)
+    ]
+
+    opened: Set[int] = set()
+    safe_list = [cell_id for cell_id in range(size) if cell_id not in mine_set]
+    rng.shuffle(safe_list)
+    goal = int(len(safe_list) * reveal_ratio)
+    for cell_id in safe_list:
+        if len(opened) >= goal:
+            break
+        stack = [cell_id]
+        while stack:
+            cell_id = stack.pop()
+            if cell_id in opened:
+                continue
+            opened.add(cell_id)
+            if adj_count[cell_id] == 0:
+                stack.extend(geometry.adj_id(cell_id))
+
+    relation_list: List[BitRelation] = []
+    for cell_id in opened:
+        mask = 0
+        for adj in geometry.adj_id(cell_id):
+            if adj not in opened:
+                mask |= 1 << adj
+        if mask:
+            relation_list.append(BitRelation(mask, adj_count[cell_id]))
+
+    return geometry, mine_set, opened, relation_list
+
+
+def frontier_mask(relation_list) -> int:
+    mask = 0
+    for relation in relation_list:
+        mask |= relation.mask
+    return mask
+
+
+def brute_force(relation_list) -> Tuple[int, int]:
+    """
+    관계를 만족하는 모든 배치를 보고 (항상 안전한 mask, 항상 지뢰인 mask)
+    """
+    mask = frontier_mask(relation_list)
+    cell_list = list(iter_bit(mask))
+    safe = mine = mask
+    for bits in range(1 << len(cell_list)):
+        mines = 0
+        for i, cell_id in enumerate(cell_list):
+            if bits >> i & 1:
+                mines |= 1 << cell_id
+        if all(
+            (mines & relation.mask).bit_count() == relation.count
+            for relation in relation_list
+        ):
+            safe &= ~mines
+            mine &= mines
+    return safe, mine
+
+
+def assert_sound(deduce, kind, seed=1):
+    """
+    deduce가 확실하다고 한 곳이 실제 지뢰 위치와 맞는지 확인한다.
+    """
+    rng = random.Random(seed)
+    for _ in range(40):
+        _, mine_set, _, relation_list = hidden_board(
+            12, 10, 20, rng, rng.choice([0.2, 0.4, 0.6]), kind
+        )
+        safe_mask, mine_mask = deduce(relation_list)
+        assert safe_mask & mine_mask == 0
+        for cell_id in iter_bit(safe_mask):
+            assert cell_id not in mine_set
+        for cell_id in iter_bit(mine_mask):
+            assert cell_id in mine_set
@@ -0,0 +1,9 @@
+import builtins
+
+import pytest
+
+
+@pytest.fixture
+def quiet(monkeypatch):
+    # solver가 게임마다 찍는 결과를 숨긴다.
+    monkeypatch.setattr(builtins, 'print', lambda *args, **kwargs: None)
@@ -0,0 +1,64 @@
+import pytest
+
+from puzzle.minesweeper.board import (BoardCorpus, BoardGenerator,
+                                      generate_corpus)
+from puzzle.minesweeper.game_memory import MemoryInterface
+from puzzle.minesweeper.geometry import get_geometry
+
+
+def first_click_area(geometry, click, policy):
+    first = geometry.to_id(*click)
+    if policy == 'zero':
+        return {first, *geometry.adj_id(first)}
+    return {first}
+
+
+@pytest.mark.parametrize('kind', ['square', 'torus', 'hex'])
+@pytest.mark.parametrize('policy', ['safe', 'zero'])
+def test_generator_keeps_first_click_clear(kind, policy):
+    generator = BoardGenerator(9, 7, 40, kind, policy)
+    geometry = get_geometry(9, 7, kind)
+    for seed in range(200):
+        click = seed % 9, seed // 9 % 7
+        mine_list = generator.generate(seed, click)
+
+        assert len(set(mine_list)) == 40
+        assert mine_list == sorted(mine_list)
+        assert 0 <= mine_list[0] and mine_list[-1] < 9 * 7
+        assert not first_click_area(geometry, click, policy) & set(mine_list)
+
+        # 같은 seed면 같은 board
+        assert generator.generate(seed, click) == mine_list
+
+
+@pytest.mark.parametrize('kind', ['square', 'torus'])
+@pytest.mark.parametrize('policy', ['safe', 'zero'])
+def test_corpus_moves_board_to_first_click(tmp_path, kind, policy):
+    path = tmp_path / 'boards.bin'
+    generate_corpus(path, 9, 7, 20, 30, seed=14, policy=policy)
+    corpus = BoardCorpus(path)
+    geometry = get_geometry(9, 7, kind)
+    try:
+        assert len(corpus) == 30
+        for index in range(len(corpus)):
+            click = index % 9, index * 5 % 7
+            mine_list = corpus.get_mine_list(index, click)
+            assert len(set(mine_list)) == 20
+            assert not first_click_area(geometry, click, policy) & \
+                set(mine_list)
+    finally:
+        corpus.close()
+
+
+def test_corpus_policy_must_match(tmp_path):
+    path = tmp_path / 'boards.bin'
+    generate_corpus(path, 9, 7, 20, 3, policy='safe')
+    corpus = BoardCorpus(path)
+    try:
+        with pytest.raises(ValueError):
+            MemoryInterface(9, 7, 20, policy='zero', corpus=corpus)
+        with pytest.raises(ValueError):
+            MemoryInterface(9, 8, 20, corpus=corpus)
+        MemoryInterface(9, 7, 20, policy='safe', corpus=corpus)
+    finally:
+        corpus.close()
@@ -0,0 +1,19 @@
+import pytest
+
+from puzzle.minesweeper.game_memory import MemoryInterface
+from puzzle.minesweeper.solver import MinesweeperSolver
+
+GEOMETRY_LIST = ['square', 'hex', 'torus']
+
+
+@pytest.mark.parametrize('kind', GEOMETRY_LIST)
+@pytest.mark.parametrize('deduction', ['subset', 'linear', 'sat'])
+def test_solver_games_self_check(quiet, kind, deduction):
+    # self_check가 켜져 있으면 매 수마다 counter를 전체 board와 비교한다.
+    api = MemoryInterface(16, 16, 40, seed=9, geometry=kind, self_check=True)
+    api.wait = lambda: None
+    solver = MinesweeperSolver(api, seed=9, deduction=deduction)
+    solver.solve(10)
+
+    assert api.try_count == 10
+    assert api.succeed_count > 0
@@ -0,0 +1,27 @@
+import random
+
+from puzzle.minesweeper.linear import LinearReducer
+from puzzle.minesweeper.reduction import RelationReducer
+from tests.board_util import assert_sound, hidden_board
+
+
+def test_linear_is_sound():
+    # 확실하다고 한 곳은 실제 지뢰 위치와 맞아야 한다.
+    for kind in ['square', 'torus', 'hex']:
+        assert_sound(LinearReducer().deduce, kind)
+
+
+def test_linear_finds_at_least_subset():
+    rng = random.Random(4)
+    for _ in range(40):
+        _, _, _, relation_list = hidden_board(12, 10, 20, rng, 0.4)
+        subset_safe = subset_mine = 0
+        for relation in RelationReducer().reduce(relation_list):
+            if relation.has_save():
+                subset_safe |= relation.mask
+            elif relation.has_bomb():
+                subset_mine |= relation.mask
+
+        safe_mask, mine_mask = LinearReducer().deduce(relation_list)
+        assert subset_safe & ~safe_mask == 0
+        assert subset_mine & ~mine_mask == 0
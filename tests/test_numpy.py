@@ -0,0 +1,44 @@
+import random
+
+import pytest
+
+from puzzle.minesweeper.game_memory import MemoryInterface
+from puzzle.minesweeper.game_numpy import NumpyInterface
+
+
+def unknown_list(info):
+    return [
+        (x, y)
+        for y, row in enumerate(info.mine_info)
+        for x, v in enumerate(row)
+        if v == '-'
+    ]
+
+
+@pytest.mark.parametrize('kind', ['square', 'hex', 'torus'])
+@pytest.mark.parametrize('policy', ['safe', 'zero'])
+def test_memory_numpy_parity(kind, policy):
+    # 같은 seed, 같은 수를 두면 두 엔진의 board가 같아야 한다.
+    memory = MemoryInterface(
+        16, 12, 30, seed=7, geometry=kind, self_check=True, policy=policy
+    )
+    numpy = NumpyInterface(16, 12, 30, seed=7, geometry=kind, policy=policy)
+    rng = random.Random(8)
+
+    for _ in range(20):
+        memory.reset()
+        numpy.reset()
+        while not memory.is_game_over:
+            info = memory.get_info()
+            pos_list = unknown_list(info)
+            safe_list = rng.sample(pos_list, min(len(pos_list), 2))
+            mine_list = rng.sample(pos_list, min(len(pos_list), 1))
+            memory.set_place_batch(safe_list, mine_list)
+            numpy.set_place_batch(safe_list, mine_list)
+
+            assert memory.get_info().mine_info == \
+                [''.join(row) for row in numpy.get_info().mine_info]
+            assert memory.is_game_over == numpy.is_game_over
+
+    assert (memory.try_count, memory.succeed_count) == \
+        (numpy.try_count, numpy.succeed_count)
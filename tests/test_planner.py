@@ -0,0 +1,46 @@
+import pytest
+
+from puzzle.minesweeper.game_memory import MemoryInterface
+from puzzle.minesweeper.geometry import get_geometry
+from puzzle.minesweeper.planner import MovePlanner
+from puzzle.minesweeper.solver import MinesweeperSolver
+
+
+@pytest.mark.parametrize('kind', ['square', 'hex', 'torus'])
+@pytest.mark.parametrize('flag_to_win', [True, False])
+@pytest.mark.parametrize('plan', ['auto', 'always'])
+def test_planner_keeps_results(quiet, kind, flag_to_win, plan):
+    # 같은 seed면 같은 board이므로 승패는 그대로, 클릭은 더 적어야 한다.
+    result = []
+    for game_plan in [None, plan]:
+        api = MemoryInterface(
+            16, 16, 40, seed=10, geometry=kind, self_check=True,
+            flag_to_win=flag_to_win
+        )
+        api.wait = lambda: None
+        solver = MinesweeperSolver(api, seed=10, plan=game_plan)
+        solver.solve(10)
+        result.append((api.succeed_count, api.try_count, solver.action_count))
+
+    (base_win, base_try, base_action), (win, try_count, action) = result
+    assert (win, try_count) == (base_win, base_try)
+    assert action < base_action
+
+
+def test_planner_uses_known_mine():
+    # 전에 밝혀진 (0, 0) 지뢰로 (1, 1)을 chord 한다.
+    # chord에 필요 없는 (3, 3) 지뢰에는 깃발을 꽂지 않는다.
+    index = get_geometry(4, 4)
+    mine_info = ['--00', '-100', '--00', '----']
+    safe_mask = index.to_mask([(1, 0), (0, 1), (0, 2), (1, 2)])
+    known_mine_mask = index.to_mask([(0, 0), (3, 3)])
+
+    plan = MovePlanner().plan(mine_info, index, safe_mask, 0, False)
+    assert plan.chord_list == []
+
+    plan = MovePlanner().plan(
+        mine_info, index, safe_mask, 0, False, known_mine_mask
+    )
+    assert plan.flag_list == [(0, 0)]
+    assert [pos for pos, _ in plan.chord_list] == [(1, 1)]
+    assert plan.open_list == []
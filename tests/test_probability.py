@@ -0,0 +1,68 @@
+import random
+from itertools import combinations
+
+import pytest
+
+from puzzle.minesweeper.component_cache import ComponentCache
+from puzzle.minesweeper.constraint import iter_bit
+from puzzle.minesweeper.probability import ProbabilityEngine
+from tests.board_util import hidden_board
+
+
+def brute_probability(relation_list, unknown_list, mine_left):
+    """
+    남은 지뢰 수까지 맞는 배치를 모두 세어서 cell 마다 지뢰일 확률을 구한다.
+    """
+    total = 0
+    mine_count = {cell_id: 0 for cell_id in unknown_list}
+    for group in combinations(unknown_list, mine_left):
+        mines = 0
+        for cell_id in group:
+            mines |= 1 << cell_id
+        if all(
+            (mines & relation.mask).bit_count() == relation.count
+            for relation in relation_list
+        ):
+            total += 1
+            for cell_id in group:
+                mine_count[cell_id] += 1
+    return {
+        cell_id: count / total
+        for cell_id, count in mine_count.items()
+    }
+
+
+@pytest.mark.parametrize('use_cache', [False, True])
+def test_probability_is_exact(use_cache):
+    rng = random.Random(6)
+    cache = ComponentCache(256) if use_cache else None
+    checked = 0
+    while checked < 30:
+        geometry, mine_set, opened, relation_list = hidden_board(
+            5, 4, rng.randint(3, 6), rng, rng.choice([0.3, 0.5])
+        )
+        unknown_list = [
+            cell_id
+            for cell_id in range(geometry.width * geometry.height)
+            if cell_id not in opened
+        ]
+        if not relation_list or len(unknown_list) > 16:
+            continue
+
+        unknown_mask = 0
+        for cell_id in unknown_list:
+            unknown_mask |= 1 << cell_id
+        result = ProbabilityEngine(cache=cache).solve(
+            relation_list, unknown_mask, len(mine_set), geometry
+        )
+        expect = brute_probability(
+            relation_list, unknown_list, len(mine_set)
+        )
+
+        assert result.is_exact
+        for cell_id, probability in result.cell_probability.items():
+            assert probability == pytest.approx(expect[cell_id])
+        for cell_id in iter_bit(result.interior_mask):
+            assert result.interior_probability == \
+                pytest.approx(expect[cell_id])
+        checked += 1
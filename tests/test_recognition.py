@@ -0,0 +1,45 @@
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from puzzle.minesweeper.recognition import (BoardRecognizer, image_distance,
+                                            load_block_info)
+
+TEMPLATE_PATH = Path(__file__).parent.parent / 'mine_checker.png'
+
+
+def perturbed_block_list(block_info, rng, count):
+    """
+    template을 밀고, 밝기를 바꾸고, 섞고, noise를 더한 cell 그림들
+    """
+    template_list = [
+        np.asarray(image.convert('RGB'), np.int16) for image, _ in block_info
+    ]
+    block_list = []
+    for _ in range(count):
+        block = template_list[rng.integers(len(template_list))]
+        other = template_list[rng.integers(len(template_list))]
+        block = np.roll(block, rng.integers(-2, 3, 2), axis=(0, 1))
+        alpha = rng.uniform(0.5, 1.0)
+        block = block * alpha + other * (1 - alpha)
+        block = block + rng.integers(-30, 31) + rng.normal(0, 12, block.shape)
+        block_list.append(np.clip(block, 0, 255).astype(np.uint8))
+    return np.stack(block_list)
+
+
+def test_classify_matches_image_distance():
+    block_info = load_block_info(TEMPLATE_PATH, '012345xxx!->')
+    recognizer = BoardRecognizer(block_info)
+    block_list = perturbed_block_list(
+        block_info, np.random.default_rng(11), 600
+    )
+
+    index_list = recognizer.classify(block_list, chunk=64)
+    for block, index in zip(block_list, index_list):
+        image = Image.fromarray(block)
+        distance = [
+            image_distance(image, template) for template, _ in block_info
+        ]
+        # 거리가 같은 template이 여럿이면 어느 것을 골라도 된다.
+        assert distance[index] <= min(distance) + 1e-9
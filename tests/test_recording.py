@@ -0,0 +1,62 @@
+import random
+
+import pytest
+
+from puzzle.minesweeper.recording import (GameRecord, Move,
+                                          RecordingInterface, ReplayInterface,
+                                          iter_record, save_record_list)
+from puzzle.minesweeper.solver import MinesweeperSolver
+
+
+def test_round_trip_large_batch(tmp_path):
+    # 500 x 500 board에서 interior를 한번에 여는 수
+    width = height = 500
+    rng = random.Random(12)
+    cell_list = [(x, y) for y in range(height) for x in range(width)]
+    rng.shuffle(cell_list)
+    record = GameRecord(
+        width=width,
+        height=height,
+        mine_count=1000,
+        geometry='torus',
+        mine_list=sorted(cell_list[:1000], key=lambda p: (p[1], p[0])),
+        first_click=cell_list[1000],
+        move_list=[
+            Move(0.25, [cell_list[1000]], []),
+            Move(0.5, cell_list[1001:71001], cell_list[:3]),
+        ]
+    )
+    empty = GameRecord(3, 2, 0, 'hex', [], None)
+
+    path = tmp_path / 'large.rec'
+    save_record_list(path, [record, empty])
+    assert list(iter_record(path)) == [record, empty]
+
+
+def test_replay_recorded_games(tmp_path, quiet):
+    api = RecordingInterface(16, 16, 40, seed=13)
+    api.wait = lambda: None
+    MinesweeperSolver(api, seed=13).solve(5)
+
+    path = tmp_path / 'games.rec'
+    save_record_list(path, api.record_list)
+    record_list = list(iter_record(path))
+    assert len(record_list) == 5
+
+    for saved, loaded in zip(api.record_list, record_list):
+        assert sorted(loaded.mine_list) == sorted(saved.mine_list)
+        assert [(m.safe_list, m.mine_list) for m in loaded.move_list] == \
+            [(m.safe_list, m.mine_list) for m in saved.move_list]
+
+        # 기록한 수를 그대로 두면 같은 결과로 끝난다.
+        replay = ReplayInterface(loaded)
+        while not replay.is_game_over:
+            replay.set_place_batch([], [])
+        assert replay.move_index == len(loaded.move_list)
+
+
+def test_unknown_header(tmp_path):
+    path = tmp_path / 'bad.rec'
+    path.write_bytes(b'MSRC\x01')
+    with pytest.raises(ValueError):
+        list(iter_record(path))
@@ -0,0 +1,29 @@
+import os
+
+import pytest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+game_pygame = pytest.importorskip('puzzle.minesweeper.game_pygame')
+
+
+class BrokenCanvas:
+    def __init__(self):
+        game_pygame.pygame.display.init()
+
+    def render(self, info, changed_list):
+        raise RuntimeError('render failed')
+
+
+def test_render_error_reaches_game_thread(monkeypatch):
+    # 그리다가 thread가 죽어도 게임 thread가 기다리기만 하지 않아야 한다.
+    monkeypatch.setattr(game_pygame, 'PygameCanvas', BrokenCanvas)
+    thread = game_pygame.RenderThread(fps=100)
+    thread.start()
+    thread.ready.wait()
+
+    thread.publish(None, None)
+    with pytest.raises(RuntimeError):
+        thread.wait_click()
+    thread.join()
+    with pytest.raises(RuntimeError):
+        thread.publish(None, None)
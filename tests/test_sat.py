@@ -0,0 +1,95 @@
+import itertools
+import math
+import random
+
+from puzzle.minesweeper.probability import (enumerate_component,
+                                            split_component)
+from puzzle.minesweeper.sat import SatDeducer, SatSolver
+from tests.board_util import (assert_sound, brute_force, frontier_mask,
+                              hidden_board)
+
+
+def test_sat_is_sound():
+    # 확실하다고 한 곳은 실제 지뢰 위치와 맞아야 한다.
+    for kind in ['square', 'torus', 'hex']:
+        assert_sound(SatDeducer('builtin').deduce, kind)
+
+
+def test_sat_matches_brute_force():
+    rng = random.Random(2)
+    checked = 0
+    while checked < 60:
+        _, _, _, relation_list = hidden_board(
+            6, 5, rng.randint(3, 7), rng, rng.choice([0.3, 0.5])
+        )
+        if not relation_list or \
+                frontier_mask(relation_list).bit_count() > 14:
+            continue
+        assert SatDeducer('builtin').deduce(relation_list) == \
+            brute_force(relation_list)
+        checked += 1
+
+
+def test_sat_matches_enumerate_component():
+    # component마다 모든 배치를 센 결과에서 항상 0 또는 항상 지뢰인 곳
+    rng = random.Random(3)
+    for _ in range(40):
+        _, _, _, relation_list = hidden_board(10, 8, 12, rng, 0.5)
+        safe_mask, mine_mask = SatDeducer('builtin').deduce(relation_list)
+
+        expect_safe = expect_mine = 0
+        for component in split_component(relation_list):
+            solution = enumerate_component(
+                component, frontier_mask(component).bit_count(),
+                [10 ** 8, math.inf]
+            )
+            total = sum(solution.count_map.values())
+            for i, cell_id in enumerate(solution.cell_list):
+                count = sum(
+                    cell_count[i]
+                    for cell_count in solution.cell_count_map.values()
+                )
+                if count == 0:
+                    expect_safe |= 1 << cell_id
+                elif count == total:
+                    expect_mine |= 1 << cell_id
+
+        assert (safe_mask, mine_mask) == (expect_safe, expect_mine)
+
+
+def test_sat_solver_matches_brute_force():
+    rng = random.Random(5)
+    for _ in range(300):
+        var_count = rng.randint(1, 8)
+        clause_list = [
+            [
+                rng.choice([1, -1]) * rng.randint(1, var_count)
+                for _ in range(rng.randint(1, 3))
+            ]
+            for _ in range(rng.randint(1, 30))
+        ]
+        solver = SatSolver()
+        for clause in clause_list:
+            solver.add_clause(clause)
+
+        for _ in range(3):
+            assumption = [
+                rng.choice([1, -1]) * rng.randint(1, var_count)
+                for _ in range(rng.randint(0, 3))
+            ]
+            expect = any(
+                all(bits[abs(lit) - 1] == (lit > 0) for lit in assumption) and
+                all(
+                    any(bits[abs(lit) - 1] == (lit > 0) for lit in clause)
+                    for clause in clause_list
+                )
+                for bits in itertools.product((False, True), repeat=var_count)
+            )
+            assert solver.solve(assumption) == expect
+            if expect:
+                model = set(solver.get_model())
+                assert all(lit in model for lit in assumption)
+                assert all(
+                    any(lit in model for lit in clause)
+                    for clause in clause_list
+                )